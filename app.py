@@ -1,23 +1,66 @@
 from flask import (Flask, render_template, redirect, 
     session, url_for, request, flash, jsonify, current_app,
-    send_file, abort)
+    send_file, abort, Response, stream_with_context)
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
-from models import db, User, Crossword, Score
-from utils import assign_clue_numbers
-from crossword.generator import Crossword as CrosswordGenerator
+from models import db, User, Crossword, Score, BestScore
+from migrations import migrate
+from utils import compile_puzzle, numbering_fields
+from crossword.generator import Crossword as CrosswordGenerator, DEFAULT_MAX_WORDS, MAX_GRID_SIZE, MAX_WORDS
+from crossword.jobs import JobQueue, QueueFull
+from crossword.cache import ResultCache, result_key
 from slugify import slugify 
-from sqlalchemy import func, desc, or_, and_, case
+from sqlalchemy import func, desc, or_, and_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.sql import label
 from PIL import Image, ImageDraw, ImageFont
-import uuid, json, re, os
+import uuid, json, re, os, threading, time, random
+from datetime import datetime
+from collections import OrderedDict
 
 app = Flask(__name__)
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///db.sqlite3'
 app.config['SECRET_KEY'] = 'supersecretkey'
+# worker processes used for parallel crossword generation (shared pool, created on first use)
+app.config['GENERATOR_WORKERS'] = os.cpu_count() or 1
+# generation jobs run in the background on this many threads (requests only submit and poll)
+app.config['GENERATOR_JOB_WORKERS'] = 2
+# admission control: queued + running generations per process and per user (beyond: 503 + Retry-After);
+# with more jobs waiting than workers the time budget shrinks, down to GENERATOR_MIN_TIME seconds
+app.config['GENERATOR_MAX_PENDING'] = 8
+app.config['GENERATOR_MAX_PENDING_PER_USER'] = 2
+app.config['GENERATOR_MIN_TIME'] = 0.25
+# compiled puzzles (numbering, clue lists, answer key) kept in memory for the play page
+app.config['PUZZLE_CACHE_SIZE'] = 512
+# the hall of fame is served from a snapshot rebuilt in the background when scores are recorded
+# or when it is older than HALL_OF_FAME_TTL seconds, at most once per HALL_OF_FAME_MIN_INTERVAL
+app.config['HALL_OF_FAME_TTL'] = 60
+app.config['HALL_OF_FAME_MIN_INTERVAL'] = 10
+# /api/scoreboard page size: default and maximum ?limit=, and rows per query of the streamed export
+app.config['SCOREBOARD_PAGE_SIZE'] = 50
+app.config['SCOREBOARD_MAX_PAGE_SIZE'] = 200
+app.config['SCOREBOARD_EXPORT_BATCH'] = 500
+# crosswords per page of /list-games
+app.config['GAMES_PAGE_SIZE'] = 24
+# /play-random picks from an in-memory list of published crosswords, reloaded on publish or after
+# this many seconds (for crosswords published by other processes), and skips the visitor's last
+# RANDOM_AVOID_RECENT puzzles while there are others to choose from (0 to allow repeats)
+app.config['PUBLISHED_LIST_TTL'] = 300
+app.config['RANDOM_AVOID_RECENT'] = 10
+# generation results by content hash: in-memory LRU size and optional directory shared by processes
+app.config['GENERATOR_CACHE_SIZE'] = 256
+app.config['GENERATOR_CACHE_DIR'] = None
 db.init_app(app)
 
+generation_jobs = JobQueue(workers=app.config['GENERATOR_JOB_WORKERS'],
+                           max_pending=app.config['GENERATOR_MAX_PENDING'],
+                           max_pending_per_owner=app.config['GENERATOR_MAX_PENDING_PER_USER'])
+# generation requests whose time budget was shrunk because jobs were waiting
+generation_shrunk = 0
+generation_cache = ResultCache(max_entries=app.config['GENERATOR_CACHE_SIZE'],
+                               directory=app.config['GENERATOR_CACHE_DIR'])
+
 login_manager = LoginManager()
 login_manager.login_view = 'login'
 login_manager.init_app(app)
@@ -71,6 +114,305 @@ def generate_crossword_preview(crossword, output_dir='static/previews'):
     img.save(path)
     return path
 
+# crossword id -> ((updated_at, is_published), CompiledPuzzle), least recently used first
+_compiled_puzzles = OrderedDict()
+_compiled_puzzles_lock = threading.Lock()
+
+def compiled_puzzle(crossword):
+    """
+    The CompiledPuzzle of a crossword, from an in-process LRU cache. An entry is rebuilt
+    when the crossword's updated_at or is_published no longer match the cached version.
+    """
+    version = (crossword.updated_at, crossword.is_published)
+    with _compiled_puzzles_lock:
+        cached = _compiled_puzzles.get(crossword.id)
+        if cached is not None and cached[0] == version:
+            _compiled_puzzles.move_to_end(crossword.id)
+            return cached[1]
+    puzzle = compile_puzzle(json.loads(crossword.grid), json.loads(crossword.words), empty=' ',
+                            numbering=stored_numbering(crossword))
+    with _compiled_puzzles_lock:
+        _compiled_puzzles[crossword.id] = (version, puzzle)
+        _compiled_puzzles.move_to_end(crossword.id)
+        while len(_compiled_puzzles) > app.config['PUZZLE_CACHE_SIZE']:
+            _compiled_puzzles.popitem(last=False)
+    return puzzle
+
+def stored_numbering(crossword):
+    """The numbering saved with the crossword (see persist_numbering), or None for rows saved before it existed."""
+    if not crossword.number_grid or not crossword.clue_lists:
+        return None
+    clue_lists = json.loads(crossword.clue_lists)
+    return {'number_grid': json.loads(crossword.number_grid), 'across': clue_lists['across'], 'down': clue_lists['down'],
+            'answer_key': json.loads(crossword.answer_key) if crossword.answer_key else None}
+
+def persist_numbering(crossword):
+    """Compute the clue numbering and answer key of the crossword's grid and words and store them on it."""
+    puzzle = compile_puzzle(json.loads(crossword.grid), json.loads(crossword.words), empty=' ')
+    for column, value in numbering_fields(puzzle).items():
+        setattr(crossword, column, value)
+
+def player_key(score):
+    """The identity a Score counts towards on the leaderboards: the member, or the guest token and name."""
+    if score.user_id is not None:
+        return 'user_%d' % score.user_id
+    return 'guest_%s_%s' % (score.guest_token or '', score.guest_name or '')
+
+def record_score(score):
+    """
+    Add a Score, count the play on its crossword and raise the player's BestScore for the
+    crossword if it beats it; the caller commits.
+    """
+    db.session.add(score)
+    db.session.flush()
+    # counted in SQL so concurrent plays are not lost; updated_at is kept, a play does not change the puzzle
+    db.session.execute(
+        update(Crossword)
+        .where(Crossword.id == score.crossword_id)
+        .values(play_count=Crossword.play_count + 1, last_played_at=score.created_at,
+                updated_at=Crossword.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    best = sqlite_insert(BestScore).values(
+        crossword_id=score.crossword_id,
+        player_key=player_key(score),
+        user_id=score.user_id,
+        guest_name=score.guest_name,
+        score=score.score,
+        score_id=score.id,
+        achieved_at=score.created_at,
+    )
+    db.session.execute(best.on_conflict_do_update(
+        index_elements=[BestScore.crossword_id, BestScore.player_key],
+        set_={'score': best.excluded.score, 'score_id': best.excluded.score_id,
+              'achieved_at': best.excluded.achieved_at},
+        where=best.excluded.score > BestScore.score,
+    ))
+
+def build_hall_of_fame():
+    """
+    The hall of fame from best_scores: the global top 10 players and the top 5 of every
+    published crossword (one windowed query), as plain dicts that outlive the session.
+    """
+    player_name = func.coalesce(User.username, BestScore.guest_name)
+    global_leaderboard = [
+        {'player_name': name, 'best_score': best}
+        for name, best in db.session.query(func.max(player_name), func.max(BestScore.score).label('best_score'))
+        .outerjoin(User, BestScore.user_id == User.id)
+        .group_by(BestScore.player_key)
+        .order_by(desc('best_score'))
+        .limit(10)
+    ]
+
+    ranked = (
+        db.session.query(
+            BestScore.crossword_id,
+            player_name.label('player_name'),
+            BestScore.score.label('best_score'),
+            func.row_number().over(partition_by=BestScore.crossword_id,
+                                   order_by=BestScore.score.desc()).label('rnk')
+        )
+        .outerjoin(User, BestScore.user_id == User.id)
+    ).subquery()
+    rows = (
+        db.session.query(Crossword.id, Crossword.title, Crossword.slug, Crossword.author_username,
+                         ranked.c.player_name, ranked.c.best_score)
+        .outerjoin(ranked, and_(ranked.c.crossword_id == Crossword.id, ranked.c.rnk <= 5))
+        .filter(Crossword.is_published == True)
+        .order_by(Crossword.created_at.desc(), Crossword.id, ranked.c.rnk)
+    )
+    leaderboard_data = []
+    for cw_id, title, slug, author_username, name, best in rows:
+        if not leaderboard_data or leaderboard_data[-1][0]['id'] != cw_id:
+            cw = {'id': cw_id, 'title': title, 'slug': slug, 'author_username': author_username}
+            leaderboard_data.append((cw, []))
+        if best is not None:
+            leaderboard_data[-1][1].append({'player_name': name, 'best_score': best})
+
+    return {'global_leaderboard': global_leaderboard, 'leaderboard_data': leaderboard_data}
+
+_hall_of_fame = {'data': None, 'built_at': 0.0, 'stale': False, 'refreshing': False}
+_hall_of_fame_lock = threading.Lock()
+
+def _refresh_hall_of_fame():
+    # background thread: rebuild until no invalidation arrived during the build; scores recorded
+    # meanwhile only mark the snapshot stale, so under steady play it is rebuilt once per interval
+    with app.app_context():
+        while True:
+            with _hall_of_fame_lock:
+                wait = _hall_of_fame['built_at'] + app.config['HALL_OF_FAME_MIN_INTERVAL'] - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            with _hall_of_fame_lock:
+                _hall_of_fame['stale'] = False
+            try:
+                data = build_hall_of_fame()
+            except Exception:
+                app.logger.exception("Hall of fame refresh failed")
+                data = None
+            with _hall_of_fame_lock:
+                if data is not None:
+                    _hall_of_fame.update(data=data, built_at=time.time())
+                if data is None or not _hall_of_fame['stale']:
+                    _hall_of_fame['refreshing'] = False
+                    return
+
+def _start_hall_of_fame_refresh():
+    # call with _hall_of_fame_lock held
+    if not _hall_of_fame['refreshing']:
+        _hall_of_fame['refreshing'] = True
+        threading.Thread(target=_refresh_hall_of_fame, name="hall-of-fame", daemon=True).start()
+
+def invalidate_hall_of_fame():
+    """Scores or published crosswords changed: rebuild the snapshot in the background (after the commit)."""
+    with _hall_of_fame_lock:
+        _hall_of_fame['stale'] = True
+        if _hall_of_fame['data'] is not None:
+            _start_hall_of_fame_refresh()
+
+def hall_of_fame_snapshot():
+    """
+    The current hall of fame. Only the first call builds it in the request; after that the
+    snapshot is served as is and rebuilt in the background when stale or expired.
+    """
+    with _hall_of_fame_lock:
+        data = _hall_of_fame['data']
+        if data is not None:
+            if _hall_of_fame['stale'] or time.time() - _hall_of_fame['built_at'] > app.config['HALL_OF_FAME_TTL']:
+                _start_hall_of_fame_refresh()
+            return data
+    data = build_hall_of_fame()
+    with _hall_of_fame_lock:
+        if _hall_of_fame['data'] is None:
+            _hall_of_fame.update(data=data, built_at=time.time(), stale=False)
+    return data
+
+_published = {'puzzles': None, 'loaded_at': 0.0}
+_published_lock = threading.Lock()
+
+def published_puzzles():
+    """(id, author_username, slug) of every published crossword, loaded once and reused until it expires."""
+    with _published_lock:
+        puzzles = _published['puzzles']
+        if puzzles is not None and time.time() - _published['loaded_at'] <= app.config['PUBLISHED_LIST_TTL']:
+            return puzzles
+    puzzles = tuple(db.session.query(Crossword.id, Crossword.author_username, Crossword.slug)
+                    .filter(Crossword.is_published == True))
+    with _published_lock:
+        _published.update(puzzles=puzzles, loaded_at=time.time())
+    return puzzles
+
+def invalidate_published_puzzles():
+    with _published_lock:
+        _published['puzzles'] = None
+
+def remember_played(crossword_id):
+    """Keep the ids of the visitor's last RANDOM_AVOID_RECENT puzzles in the session."""
+    keep = app.config['RANDOM_AVOID_RECENT']
+    if not keep:
+        return
+    recent = [i for i in session.get('recent_puzzles', []) if i != crossword_id]
+    session['recent_puzzles'] = (recent + [crossword_id])[-keep:]
+
+GENERATOR_ENGINES = ('random', 'backtracking', 'annealing', 'fit')
+
+def run_generator(gen, engine='random', time_permitted=1.0, progress=None):
+    """
+    Fill a CrosswordGenerator with the requested engine ('random', 'backtracking', 'annealing'
+    or 'fit', which shrinks the grid to the most compact one that holds every word).
+    The searches run on the shared process pool ('random' and 'fit' only with more than one
+    GENERATOR_WORKERS), so they do not compete with requests for this process's GIL.
+    progress is passed to the engines that report improvements (all but 'fit');
+    gen.best_to_json() then returns the best layout so far.
+    """
+    if engine in ('backtracking', 'annealing'):
+        return gen.compute_crossword_offloaded(engine, time_permitted=time_permitted,
+                                               workers=app.config['GENERATOR_WORKERS'], progress=progress)
+    if engine == 'fit':
+        return gen.compute_crossword_fit(time_permitted=time_permitted, workers=app.config['GENERATOR_WORKERS'])
+    return gen.compute_crossword_parallel(time_permitted=time_permitted, workers=app.config['GENERATOR_WORKERS'],
+                                          progress=progress)
+
+def submit_generation(gen, engine='random', time_permitted=1.0, pinned=None):
+    """
+    Queue a generator run on generation_jobs for the current user and return the job.
+    With pinned placements only the other words are searched (see admin_edit).
+    The result is gen.to_json() plus 'unplaced', the words left out of the layout.
+    Unpinned runs are cached by content (generation_cache): a repeated request with
+    the same words, size, engine, seed and (possibly shrunk) time budget returns an
+    already finished job.
+    Raises QueueFull when the admission limits are reached.
+    """
+    global generation_shrunk
+    # with jobs waiting, shorter runs keep the queue draining at the same rate
+    waiting = generation_jobs.pending() + 1
+    shrunk = waiting > generation_jobs.workers
+    if shrunk:
+        time_permitted = max(app.config['GENERATOR_MIN_TIME'], time_permitted * generation_jobs.workers / waiting)
+
+    key = None
+    if not pinned:
+        # keyed by the budget the run actually gets, so a shrunk run is not served for a full one
+        key = result_key([(wd.word, wd.clue) for wd in gen.available_words], rows=gen.rows, cols=gen.cols,
+                         max_words=gen.max_words, engine=engine, seed=gen.seed, time_permitted=time_permitted)
+        cached = generation_cache.get(key)
+        if cached is not None:
+            return generation_jobs.complete(cached, owner=current_user.id)
+
+    def work(job):
+        def progress(stats):
+            job.report(stats, gen.best_to_json())
+
+        if pinned:
+            gen.pin_words(pinned)
+            run_generator(gen, engine='backtracking', time_permitted=time_permitted, progress=progress)
+        else:
+            run_generator(gen, engine=engine, time_permitted=time_permitted, progress=progress)
+        result = gen.to_json()
+        placed = {w["word"] for w in result["words"]}
+        result["unplaced"] = [wd.word for wd in gen.available_words if wd.word not in placed]
+        if key is not None:
+            generation_cache.put(key, result)
+        return result
+
+    job = generation_jobs.submit(work, owner=current_user.id)
+    if shrunk:
+        generation_shrunk += 1
+    return job
+
+def generator_size(source, rows=15, cols=15, max_words=DEFAULT_MAX_WORDS):
+    """
+    Read 'rows', 'cols' (5..MAX_GRID_SIZE) and 'max_words' (1..MAX_WORDS) from a request
+    dict, with the given defaults for missing or empty fields. Raises ValueError when out of bounds.
+    """
+    def bounded(name, default, low, high):
+        value = source.get(name)
+        value = default if value in (None, '') else int(value)
+        if not low <= value <= high:
+            raise ValueError('%s must be between %d and %d' % (name, low, high))
+        return value
+
+    return dict(rows=bounded('rows', rows, 5, MAX_GRID_SIZE),
+                cols=bounded('cols', cols, 5, MAX_GRID_SIZE),
+                max_words=bounded('max_words', max_words, 1, MAX_WORDS))
+
+def generator_engine(source):
+    """
+    Read 'engine' from a request dict: one of GENERATOR_ENGINES, 'random' when missing
+    or empty. Raises ValueError for any other value.
+    """
+    engine = source.get('engine') or 'random'
+    if engine not in GENERATOR_ENGINES:
+        raise ValueError('engine must be one of %s' % ', '.join(GENERATOR_ENGINES))
+    return engine
+
+def edited_size(grid, word_count):
+    """generator_size defaults for regenerating a puzzle: its own grid size, and room for all its words."""
+    rows = len(grid) or 15
+    cols = len(grid[0]) if grid else 15
+    return dict(rows=max(5, min(MAX_GRID_SIZE, rows)), cols=max(5, min(MAX_GRID_SIZE, cols)),
+                max_words=max(1, min(MAX_WORDS, max(DEFAULT_MAX_WORDS, word_count))))
+
 @app.route('/login', methods=['GET', 'POST'])
 def login():
     if current_user.is_authenticated:
@@ -126,6 +468,7 @@ def generate_preview():
     data = request.get_json()
     title = data.get('title', '').strip()
     words = data.get('words', [])
+    seed = data.get('seed')
 
     # Sanitize
     available_words = [(w['word'].strip(), w['clue'].strip()) for w in words if w['word'] and w['clue']]
@@ -133,13 +476,55 @@ def generate_preview():
     if not available_words:
         return jsonify({'error': 'No valid words provided'}), 400
 
-    gen = CrosswordGenerator(cols=15, rows=15, available_words=available_words)
-    gen.compute_crossword(time_permitted=1.0)
-    crossword_data = gen.to_json()
+    try:
+        seed = int(seed) if seed is not None else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid seed'}), 400
+
+    try:
+        size = generator_size(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': 'Invalid grid size: %s' % e}), 400
+
+    try:
+        engine = generator_engine(data)
+    except ValueError as e:
+        return jsonify({'error': 'Invalid engine: %s' % e}), 400
+
+    gen = CrosswordGenerator(available_words=available_words, seed=seed, **size)
+    try:
+        job = submit_generation(gen, engine=engine, time_permitted=1.0)
+    except QueueFull as e:
+        response = jsonify({'error': str(e), 'retry_after': e.retry_after})
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response, 503
+    if job.status == 'done':
+        return jsonify(job.result)
+
+    return jsonify({
+        'job_id': job.id,
+        'status_url': url_for('generation_status', job_id=job.id)
+    }), 202
+
+
+@app.route('/admin/jobs/<job_id>')
+@login_required
+def generation_status(job_id):
+    """Status of a generation job: progress and best layout so far, then the final result."""
+    job = generation_jobs.get(job_id)
+    if job is None or job.owner != current_user.id:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job.to_dict())
+
 
+@app.route('/admin/generator/stats')
+@login_required
+def generation_stats():
+    """Admission, queue and cache counters of this process's generator."""
     return jsonify({
-        'grid': crossword_data['grid'],
-        'words': crossword_data['words']
+        'jobs': generation_jobs.stats(),
+        'shrunk': generation_shrunk,
+        'cache': {'hits': generation_cache.hits, 'misses': generation_cache.misses},
     })
 
 
@@ -162,6 +547,7 @@ def save_crossword():
         words=json.dumps(words),
         font_file=font_name,
     )
+    persist_numbering(crossword)
     db.session.add(crossword)
     db.session.commit()
 
@@ -181,58 +567,99 @@ def admin_edit(id):
     if request.method == 'POST':
         title = request.form.get('title', crossword.title)
         if 'generate' in request.form:
+            # the form carries the layout on screen, which may be regenerated but not yet saved
+            try:
+                preview = json.loads(request.form.get('griddata') or crossword.grid)
+                words = json.loads(request.form.get('wordlist') or crossword.words)
+            except ValueError:
+                pass
+            new_word = request.form.get('new_word', '').strip()
+            new_clue = request.form.get('new_clue', '').strip()
+            if new_word and new_clue:
+                words.append({"word": new_word, "clue": new_clue})
             available_words = []
+            pinned = []
             for w in words:
                 if isinstance(w, dict):
                     word, clue = w.get("word"), w.get("clue")
+                    placement = (w.get("row"), w.get("col"), w.get("vertical"))
                 else:
                     word, clue = w
+                    placement = (None, None, None)
                 if word and clue:
                     available_words.append((word.strip(), clue.strip()))
-            gen = CrosswordGenerator(cols=15, rows=15, available_words=available_words)
-            gen.compute_crossword(time_permitted=1.0)
-            crossword_data = gen.to_json()
-            preview = crossword_data["grid"]
-            words = crossword_data["words"]
-
-            flash("✅ Crossword regenerated (not yet saved). Click 'Save' to store changes.")
+                    if None not in placement:
+                        pinned.append((word, clue) + placement)
+            try:
+                size = generator_size(request.form, **edited_size(preview, len(available_words)))
+            except ValueError as e:
+                flash("Invalid grid size: %s" % e)
+                return redirect(url_for('admin_edit', id=id))
+            try:
+                engine = generator_engine(request.form)
+            except ValueError as e:
+                flash("Invalid engine: %s" % e)
+                return redirect(url_for('admin_edit', id=id))
+            # a fresh seed per click: every press gives another layout instead of the cached one
+            seed = random.randrange(2 ** 31)
+            try:
+                if request.form.get('generate') != 'all' and pinned and len(pinned) < len(available_words):
+                    # keep the layout the editor already has: pin the placed words on the current
+                    # grid and search only the new or unplaced ones
+                    size.update(rows=len(preview), cols=len(preview[0]), max_words=None)
+                    gen = CrosswordGenerator(available_words=available_words, seed=seed, **size)
+                    job = submit_generation(gen, time_permitted=1.0, pinned=pinned)
+                else:
+                    gen = CrosswordGenerator(available_words=available_words, seed=seed, **size)
+                    job = submit_generation(gen, engine=engine, time_permitted=1.0)
+            except QueueFull as e:
+                flash("⚠️ %s, please try again in %d seconds." % (e, e.retry_after))
+                return redirect(url_for('admin_edit', id=id))
+            # the page polls the job and shows its layout once it is done
+            return redirect(url_for('admin_edit', id=id, job=job.id))
         elif 'save' in request.form:
             crossword.title = title
             grid_data = request.form.get('griddata') 
             word_data = request.form.get('wordlist')
             crossword.grid = grid_data
             crossword.words = word_data
+            persist_numbering(crossword)
             db.session.commit()
+            invalidate_hall_of_fame()
             flash("✅ Crossword saved.")
             return redirect(url_for('admin_dashboard'))
-    numbering = assign_clue_numbers(preview, words, empty=' ')
-    number_grid = numbering.get("number_grid")
 
-    rows = len(preview)
-    cols = len(preview[0]) if rows else 0
+    pending_job = None
+    regenerated = False
+    job_id = request.args.get('job')
+    if request.method == 'GET' and job_id:
+        job = generation_jobs.get(job_id)
+        if job is None or job.owner != current_user.id:
+            flash("⚠️ The generated layout has expired, please generate again.")
+        elif job.status == 'done':
+            preview = job.result["grid"]
+            words = job.result["words"]
+            regenerated = True
+            if job.result["unplaced"]:
+                flash("⚠️ Could not place: %s" % ", ".join(job.result["unplaced"]))
+            flash("✅ Crossword regenerated (not yet saved). Click 'Save' to store changes.")
+        elif job.status == 'failed':
+            flash("⚠️ Generation failed: %s" % job.error)
+        else:
+            pending_job = job
 
-    if not number_grid:
-        number_grid = [[None] * cols for _ in range(rows)]
-    else:
-        while len(number_grid) < rows:
-            number_grid.append([None] * cols)
-        for r in range(rows):
-            if len(number_grid[r]) < cols:
-                number_grid[r].extend([None] * (cols - len(number_grid[r])))
-
-    clues = {
-        "all": numbering["clues"],
-        "across": numbering["across"],
-        "down": numbering["down"]
-    }
+    # the saved layout's numbering is stored; only a regenerated one is numbered here
+    puzzle = compile_puzzle(preview, words, empty=' ') if regenerated else compiled_puzzle(crossword)
 
     return render_template(
         'admin/edit.html',
         crossword=crossword,
         preview=preview,
         words=words,
-        numbers=number_grid,
-        clues=clues
+        numbers=puzzle.number_grid,
+        clues=puzzle.clues,
+        size=edited_size(preview, len(words)),
+        pending_job=pending_job
     )
 
 
@@ -241,7 +668,10 @@ def admin_edit(id):
 def admin_publish(id):
     crossword = Crossword.query.get_or_404(id)
     crossword.is_published = True
+    persist_numbering(crossword)
     db.session.commit()
+    invalidate_hall_of_fame()
+    invalidate_published_puzzles()
 
     generate_crossword_preview(crossword)
 
@@ -282,35 +712,10 @@ def play_crossword(author_username, slug):
             return redirect('/admin')
         return redirect('/')
 
-    grid = json.loads(crossword.grid)
-    words = json.loads(crossword.words)
-
-    identity = case(
-        (
-            Score.user_id.isnot(None),
-            ('user_' + func.cast(Score.user_id, db.String))
-        ),
-        else_=(
-            'guest_' + func.coalesce(Score.guest_token, '') + '_' + func.coalesce(Score.guest_name, '')
-        )
-    )
-
-    ranked = (
-        db.session.query(
-            Score,
-            func.row_number().over(
-                partition_by=identity,
-                order_by=Score.score.desc()
-            ).label('rnk')
-        )
-        .filter(Score.crossword_id == crossword.id)
-    ).subquery()
-
     scores = (
-        db.session.query(Score)
-        .join(ranked, Score.id == ranked.c.id)
-        .filter(ranked.c.rnk == 1)
-        .order_by(Score.score.desc())
+        BestScore.query
+        .filter_by(crossword_id=crossword.id)
+        .order_by(BestScore.score.desc())
         .limit(5)
         .all()
     )
@@ -336,94 +741,31 @@ def play_crossword(author_username, slug):
                 score=score_value
             )
 
-        db.session.add(new_score)
+        record_score(new_score)
         db.session.commit()
+        invalidate_hall_of_fame()
         flash('Your score has been recorded!')
         return redirect(url_for('play_crossword', author_username=author_username, slug=slug))
 
     guest_name = session.get('guest_name', '')
+    remember_played(crossword.id)
 
-    numbering = assign_clue_numbers(grid, words, empty=' ')
-    number_grid = numbering.get("number_grid")
-
-    rows = len(grid)
-    cols = len(grid[0]) if rows else 0
-
-    if not number_grid:
-        number_grid = [[None] * cols for _ in range(rows)]
-    else:
-        while len(number_grid) < rows:
-            number_grid.append([None] * cols)
-        for r in range(rows):
-            if len(number_grid[r]) < cols:
-                number_grid[r].extend([None] * (cols - len(number_grid[r])))
-
-    clues = {
-        "all": numbering["clues"],
-        "across": numbering["across"],
-        "down": numbering["down"]
-    }
-
-    num_map = {}
-    for c in numbering['clues']:
-        key = (int(c['row']), int(c['col']), True if c['orientation'] == 'down' else False)
-        num_map[key] = int(c['number'])
-
-    annotated_words = []
-    for w in words:
-        if isinstance(w, dict):
-            row = int(w.get('row', 0))
-            col = int(w.get('col', 0))
-            vert = bool(w.get('vertical', False))
-            number = num_map.get((row, col, vert))
-            neww = w.copy()
-            neww['number'] = number
-            annotated_words.append(neww)
-        else:
-            word_text, clue_text, row, col, vert = w[0], w[1], w[2], w[3], w[4]
-            number = num_map.get((int(row), int(col), bool(vert)))
-            annotated_words.append({
-                'word': word_text,
-                'clue': clue_text,
-                'row': int(row),
-                'col': int(col),
-                'vertical': bool(vert),
-                'number': number
-            })
-    safe_words = []
-    for w in words:
-        if isinstance(w, dict):
-            row = int(w.get('row', 0))
-            col = int(w.get('col', 0))
-            vert = bool(w.get('vertical', False))
-            number = num_map.get((row, col, vert))
-        else:
-            word_text, clue_text, row, col, vert = w[0], w[1], w[2], w[3], w[4]
-            number = num_map.get((int(row), int(col), bool(vert)))
-        safe_words.append({
-            "number": number,
-            "clue": w["clue"],
-            "row": w["row"],
-            "col": w["col"],
-            "vertical": w["vertical"],
-            "length": len(w["word"])
-        })
+    puzzle = compiled_puzzle(crossword)
     return render_template(
         'play/play.html',
         crossword=crossword,
-        grid=grid,
-        words=annotated_words,
-        words_meta=safe_words,
+        grid=puzzle.grid,
+        words=puzzle.words,
+        words_meta=puzzle.words_meta,
         guest_name=guest_name,
         scores=scores,
-        numbers=number_grid,
-        clues=clues
+        numbers=puzzle.number_grid,
+        clues=puzzle.clues
     )
 
 @app.post('/api/submit_answers/<int:crossword_id>')
 def submit_crossword_answers(crossword_id):
     crossword = Crossword.query.get_or_404(crossword_id)
-    words = json.loads(crossword.words)
     answers = request.json.get('answers', [])
     guest_name = request.json.get('guest_name', '').strip() or 'Guest'
 
@@ -435,30 +777,14 @@ def submit_crossword_answers(crossword_id):
             {'success': False, 
             "message": "Belum ada jawaban yang dikirim"}
         )
-    grid = json.loads(crossword.grid)
-    numbering = assign_clue_numbers(grid, words, empty=' ')
-
-    num_map = {}
-    for c in numbering['clues']:
-        key = (int(c['row']), int(c['col']), True if c['orientation'] == 'down' else False)
-        num_map[key] = int(c['number'])
+    puzzle = compiled_puzzle(crossword)
     answer_map = {(a['number'], a['dir']): a['answer'].upper().strip() for a in answers}
 
     total = 0
     correct = 0
     details = []
 
-    for w in words:
-        if isinstance(w, dict):
-            row = int(w.get('row', 0))
-            col = int(w.get('col', 0))
-            vert = bool(w.get('vertical', False))
-            number = num_map.get((row, col, vert))
-        else:
-            word_text, clue_text, row, col, vert = w[0], w[1], w[2], w[3], w[4]
-            number = num_map.get((int(row), int(col), bool(vert)))
-        correct_word = w['word'].upper()
-        direction = 'down' if w['vertical'] else 'across'
+    for number, direction, correct_word, clue in puzzle.answers:
         user_answer = answer_map.get((number, direction), '').upper()
         total += len(correct_word)
         correct_count = sum(1 for i, ch in enumerate(correct_word) if i < len(user_answer) and user_answer[i] == ch)
@@ -466,7 +792,7 @@ def submit_crossword_answers(crossword_id):
         is_correct = user_answer == correct_word
         details.append({
             'number': number,
-            'clue': w['clue'],
+            'clue': clue,
             'dir': direction,
             'correctWord': correct_word if not is_correct else '',
             'userAnswer': user_answer,
@@ -489,8 +815,9 @@ def submit_crossword_answers(crossword_id):
         guest_name=guest_name,
         score=score
     )
-    db.session.add(new_score)
+    record_score(new_score)
     db.session.commit()
+    invalidate_hall_of_fame()
 
     return jsonify({
         'success': True,
@@ -501,11 +828,70 @@ def submit_crossword_answers(crossword_id):
     })
 
 
+def scoreboard_page(crossword_id, limit, after=None):
+    """
+    Up to `limit` of the crossword's best scores (one per player), best first, as
+    (id, score, name) rows; `after` is the (score, id) of the last row of the previous page.
+    """
+    query = (
+        db.session.query(BestScore.id, BestScore.score, func.coalesce(User.username, BestScore.guest_name))
+        .outerjoin(User, BestScore.user_id == User.id)
+        .filter(BestScore.crossword_id == crossword_id)
+    )
+    if after is not None:
+        score, row_id = after
+        # score <= ? keeps the (crossword_id, score) index range; the rest breaks ties on id
+        query = query.filter(BestScore.score <= score, or_(BestScore.score < score, BestScore.id < row_id))
+    return query.order_by(BestScore.score.desc(), BestScore.id.desc()).limit(limit).all()
+
+def parse_scoreboard_cursor(cursor):
+    """'<score>:<id>' as given in a page's `next`; raises ValueError."""
+    score, row_id = cursor.split(':')
+    return int(score), int(row_id)
+
 @app.route('/api/scoreboard/<slug>')
 def get_scoreboard(slug):
     crossword = Crossword.query.filter_by(slug=slug).first_or_404()
-    scores = Score.query.filter_by(crossword_id=crossword.id).order_by(Score.score.desc()).all()
-    return jsonify({'scores': [{'name': s.name, 'score': s.score} for s in scores]})
+    try:
+        limit = int(request.args.get('limit', app.config['SCOREBOARD_PAGE_SIZE']))
+        if limit < 1:
+            raise ValueError
+        after = request.args.get('after')
+        after = parse_scoreboard_cursor(after) if after else None
+    except ValueError:
+        return jsonify({'error': 'Invalid limit or cursor'}), 400
+    limit = min(limit, app.config['SCOREBOARD_MAX_PAGE_SIZE'])
+
+    rows = scoreboard_page(crossword.id, limit + 1, after)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = '%d:%d' % (rows[-1][1], rows[-1][0])
+    return jsonify({
+        'scores': [{'name': name, 'score': score} for _, score, name in rows],
+        'next': next_cursor
+    })
+
+@app.route('/api/scoreboard/<slug>/export')
+def export_scoreboard(slug):
+    """The whole scoreboard as one JSON document, streamed a batch of rows at a time."""
+    crossword = Crossword.query.filter_by(slug=slug).first_or_404()
+    crossword_id, batch = crossword.id, app.config['SCOREBOARD_EXPORT_BATCH']
+
+    def generate():
+        yield '{"scores": ['
+        after, separator = None, ''
+        while True:
+            rows = scoreboard_page(crossword_id, batch, after)
+            for _, score, name in rows:
+                yield separator + json.dumps({'name': name, 'score': score})
+                separator = ', '
+            if len(rows) < batch:
+                break
+            after = (rows[-1][1], rows[-1][0])
+        yield ']}'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
 
 @app.route("/", methods=["GET"])
 def home():
@@ -574,91 +960,59 @@ def crossword_preview(slug):
 
 @app.route('/list-games')
 def games_list():
-    play_counts = db.session.query(
-        Score.crossword_id,
-        func.count(Score.id).label('play_count')
-    ).group_by(Score.crossword_id).subquery()
-
-    crosswords = (
-        db.session.query(
-            Crossword,
-            func.coalesce(play_counts.c.play_count, 0).label('plays')
-        )
-        .outerjoin(play_counts, Crossword.id == play_counts.c.crossword_id)
-        .filter(Crossword.is_published == True)
-        .order_by(Crossword.created_at.desc(), func.coalesce(play_counts.c.play_count, 0).desc())
-        .all()
-    )
-
-    return render_template('landing/list-games.html', crosswords=crosswords)
+    # newest first, a page at a time; ?after=<created_at>_<id> of the last crossword shown
+    query = Crossword.query.filter(Crossword.is_published == True)
+    after = request.args.get('after')
+    if after:
+        try:
+            created_at, crossword_id = after.rsplit('_', 1)
+            created_at, crossword_id = datetime.fromisoformat(created_at), int(crossword_id)
+        except ValueError:
+            return redirect(url_for('games_list'))
+        query = query.filter(Crossword.created_at <= created_at,
+                             or_(Crossword.created_at < created_at, Crossword.id < crossword_id))
+
+    page_size = app.config['GAMES_PAGE_SIZE']
+    crosswords = query.order_by(Crossword.created_at.desc(), Crossword.id.desc()).limit(page_size + 1).all()
+    next_cursor = None
+    if len(crosswords) > page_size:
+        crosswords = crosswords[:page_size]
+        next_cursor = '%s_%d' % (crosswords[-1].created_at.isoformat(), crosswords[-1].id)
+
+    return render_template('landing/list-games.html', crosswords=crosswords, next_cursor=next_cursor,
+                           first_page=not after)
 
 @app.route('/play-random')
 def play_random():
-    crossword = (
-        Crossword.query
-        .filter_by(is_published=True)
-        .order_by(func.random()) 
-        .first()
-    )
-    if not crossword:
+    puzzles = published_puzzles()
+    if not puzzles:
         flash("No published crosswords available yet.", "warning")
         return redirect(url_for('games_list'))
-    
-    return redirect(url_for('play_crossword', slug=crossword.slug, author_username=crossword.author_username))
-
-@app.route('/hall-of-fame')
-def hall_of_fame():
-    global_scores_subq = (
-        db.session.query(
-            case(
-                (Score.user_id.isnot(None), func.coalesce(Score.user_id, 0)),
-                else_=0
-            ).label('player_id'),
-            func.coalesce(Score.guest_name, User.username).label('player_name'),
-            func.max(Score.score).label('best_score')
-        )
-        .outerjoin(User, Score.user_id == User.id)
-        .group_by('player_name', 'player_id')
-        .order_by(desc('best_score'))
-        .limit(10)
-        .subquery()
-    )
 
-    global_leaderboard = db.session.query(
-        global_scores_subq.c.player_name,
-        global_scores_subq.c.best_score
-    ).order_by(desc(global_scores_subq.c.best_score)).all()
+    recent = set(session.get('recent_puzzles', ())) if app.config['RANDOM_AVOID_RECENT'] else ()
+    # a few uniform draws almost always find one not played recently; only a small catalogue
+    # needs the explicit list of the others
+    for _ in range(8):
+        crossword_id, author_username, slug = random.choice(puzzles)
+        if crossword_id not in recent:
+            break
+    else:
+        others = [p for p in puzzles if p[0] not in recent]
+        if others:
+            crossword_id, author_username, slug = random.choice(others)
 
-    crosswords = Crossword.query.filter_by(is_published=True).order_by(Crossword.created_at.desc()).all()
-    leaderboard_data = []
-    for cw in crosswords:
-        scores_subq = (
-            db.session.query(
-                case(
-                    (Score.user_id.isnot(None), func.coalesce(Score.user_id, 0)),
-                    else_=0
-                ).label('player_id'),
-                func.coalesce(Score.guest_name, User.username).label('player_name'),
-                func.max(Score.score).label('best_score')
-            )
-            .outerjoin(User, Score.user_id == User.id)
-            .filter(Score.crossword_id == cw.id)
-            .group_by('player_name', 'player_id')
-            .order_by(desc('best_score'))
-            .limit(5)
-            .all()
-        )
-        leaderboard_data.append((cw, scores_subq))
+    return redirect(url_for('play_crossword', slug=slug, author_username=author_username))
 
+@app.route('/hall-of-fame')
+def hall_of_fame():
     return render_template(
         'landing/leaderboards.html',
-        global_leaderboard=global_leaderboard,
-        leaderboard_data=leaderboard_data
+        **hall_of_fame_snapshot()
     )
 
 if __name__ == '__main__':
     with app.app_context():
-        db.create_all()
+        migrate(db.engine)
         # create default admin
         if not User.query.filter_by(username='admin').first():
             admin = User(username='admin', password=generate_password_hash('admin'))
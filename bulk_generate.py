@@ -0,0 +1,159 @@
+"""
+Generate crosswords in bulk from a CSV or JSONL word bank.
+
+JSONL: one puzzle per line,
+    {"title": "...", "words": [{"word": "...", "clue": "..."}, ...], "rows": 15, "cols": 15, "seed": 1}
+    (rows, cols, max_words, seed, engine and font_file are optional; words may also be [word, clue] pairs)
+CSV: a header with title, word, clue columns and one word per line; the lines of a
+    puzzle must be consecutive (the file is read as a stream, grouped by title).
+
+Records are read lazily and generated on all cores a chunk at a time, so memory stays
+flat however large the file is. Puzzles are saved for the given author in batched
+transactions, with a unique slug and a preview image each.
+
+Usage:
+    python bulk_generate.py words.jsonl --author admin
+    python bulk_generate.py words.csv --author admin --publish --time 2 --workers 4
+"""
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+
+from slugify import slugify
+
+from app import app, generate_crossword_preview, persist_numbering
+from crossword.generator import Crossword as CrosswordGenerator, DEFAULT_MAX_WORDS
+from models import Crossword, User, db
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as fh:
+        for line_no, line in enumerate(fh, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                print(f"line {line_no}: invalid JSON ({e}), skipped", file=sys.stderr)
+                continue
+            words = []
+            for w in record.get('words', []):
+                word, clue = (w.get('word'), w.get('clue')) if isinstance(w, dict) else w
+                words.append((word, clue))
+            record['words'] = words
+            yield record
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8', newline='') as fh:
+        rows = csv.DictReader(fh)
+        for title, group in itertools.groupby(rows, key=lambda row: (row.get('title') or '').strip()):
+            yield {'title': title, 'words': [(row.get('word'), row.get('clue')) for row in group]}
+
+
+def generate(record):
+    """Worker: build one puzzle. Returns (record, to_json() result) or (record, error message)."""
+    words = [(w.strip(), c.strip()) for w, c in record['words'] if w and c and w.strip() and c.strip()]
+    if not record.get('title') or not words:
+        return record, 'needs a title and at least one word with a clue'
+    try:
+        gen = CrosswordGenerator(rows=record.get('rows', 15), cols=record.get('cols', 15), available_words=words,
+                                 seed=record.get('seed'), max_words=record.get('max_words', DEFAULT_MAX_WORDS))
+        engine = record.get('engine', 'random')
+        time_permitted = record['time']
+        if engine == 'backtracking':
+            result = gen.compute_crossword_backtracking(time_permitted)
+        elif engine == 'annealing':
+            result = gen.compute_crossword_annealing(time_permitted)
+        elif engine == 'fit':
+            result = gen.compute_crossword_fit(time_permitted, workers=1)
+        else:
+            result = gen.compute_crossword(time_permitted)
+    except (TypeError, ValueError) as e:
+        return record, str(e)
+    if not result['words']:
+        return record, 'no word could be placed'
+    return record, result
+
+
+def unique_slug(title, taken):
+    """slugify(title), suffixed -2, -3, ... until it is neither in the database nor in `taken`."""
+    base = slugify(title)
+    slug, n = base, 1
+    while slug in taken or Crossword.query.filter_by(slug=slug).first() is not None:
+        n += 1
+        slug = f"{base}-{n}"
+    return slug
+
+
+def save_batch(results, author, publish, font_file):
+    """Insert one chunk of generated puzzles in a single transaction, then draw their previews."""
+    crosswords = []
+    taken = set()
+    for record, result in results:
+        slug = unique_slug(record['title'], taken)
+        taken.add(slug)
+        crossword = Crossword(
+            title=record['title'],
+            slug=slug,
+            author_username=author.username,
+            author_id=author.id,
+            grid=json.dumps(result['grid']),
+            words=json.dumps(result['words']),
+            font_file=record.get('font_file', font_file),
+            is_published=publish,
+        )
+        persist_numbering(crossword)
+        db.session.add(crossword)
+        crosswords.append(crossword)
+    db.session.commit()
+    for crossword in crosswords:
+        generate_crossword_preview(crossword)
+    return len(crosswords)
+
+
+def bulk_generate(path, author_name, time_permitted=1.0, workers=None, batch_size=50, publish=False,
+                  font_file=None):
+    reader = read_csv if path.lower().endswith('.csv') else read_jsonl
+    workers = workers or os.cpu_count() or 1
+    with app.app_context():
+        author = User.query.filter_by(username=author_name).first()
+        if not author:
+            print(f"No user named {author_name!r}.")
+            return
+        records = ({**record, 'time': time_permitted} for record in reader(path))
+        saved = failed = 0
+        with multiprocessing.Pool(workers) as pool:
+            # one chunk in flight at a time keeps memory flat for any input size
+            while True:
+                chunk = list(itertools.islice(records, batch_size))
+                if not chunk:
+                    break
+                results = []
+                for record, result in pool.imap(generate, chunk):
+                    if isinstance(result, str):
+                        failed += 1
+                        print(f"{record.get('title')!r}: {result}, skipped", file=sys.stderr)
+                    else:
+                        results.append((record, result))
+                saved += save_batch(results, author, publish, font_file)
+                print(f"{saved} crosswords saved, {failed} skipped")
+        print(f"Done: {saved} crosswords saved, {failed} skipped.")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate crosswords in bulk from a CSV or JSONL word bank.")
+    parser.add_argument('path', help="a .csv or .jsonl file")
+    parser.add_argument('--author', default='admin', help="username that will own the puzzles (default: admin)")
+    parser.add_argument('--time', type=float, default=1.0, help="generation time per puzzle in seconds")
+    parser.add_argument('--workers', type=int, default=None, help="processes to use (default: all cores)")
+    parser.add_argument('--batch-size', type=int, default=50, help="puzzles per transaction")
+    parser.add_argument('--publish', action='store_true', help="publish the puzzles right away")
+    parser.add_argument('--font-file', default=None, help="font for puzzles that do not name one")
+    args = parser.parse_args()
+    bulk_generate(args.path, args.author, args.time, args.workers, args.batch_size, args.publish, args.font_file)
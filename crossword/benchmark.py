@@ -0,0 +1,236 @@
+"""
+Benchmarks for crossword.generator.
+
+Runs every engine on fixed word lists drawn from benchmark_words.txt (Indonesian and
+regional words) over several grid sizes and seeds, and reports throughput and quality
+as JSON. A saved report can be used as a baseline for later runs.
+
+Usage:
+    python -m crossword.benchmark run --output baseline.json
+    python -m crossword.benchmark run --words 10 30 --sizes 15 --time 0.5
+    python -m crossword.benchmark compare baseline.json current.json --tolerance 0.1
+    python -m crossword.benchmark check --grids 50
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .generator import Crossword, np
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "benchmark_words.txt")
+
+WORD_COUNTS = (10, 30, 100, 500)
+GRID_SIZES = (15, 25, 50)
+SEEDS = (1, 2, 3)
+ENGINES = ("random", "backtracking", "annealing")
+
+# metrics where a lower value in the current run is a regression
+COMPARED_METRICS = ("iterations_per_sec", "candidates_per_sec", "words_placed", "score")
+
+
+def load_corpus(path: str = CORPUS_PATH) -> List[str]:
+    """Return the corpus words in file order (comments and duplicates skipped)."""
+    words: List[str] = []
+    seen = set()
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.split("#", 1)[0]
+            for word in line.split():
+                word = word.upper()
+                if word not in seen:
+                    seen.add(word)
+                    words.append(word)
+    return words
+
+
+def word_list(corpus: List[str], count: int) -> List[Tuple[str, str]]:
+    """The fixed benchmark list of `count` words: a seeded sample of the corpus."""
+    if count > len(corpus):
+        raise ValueError("corpus has only %d words, %d requested" % (len(corpus), count))
+    picked = random.Random(count).sample(corpus, count)
+    return [(word, "Petunjuk " + word.lower()) for word in picked]
+
+
+def run_case(engine: str, words: List[Tuple[str, str]], size: int, seed: int, time_permitted: float) -> Dict[str, Any]:
+    """Run one engine on one word list and grid size; return the measurements."""
+    cw = Crossword(rows=size, cols=size, available_words=words, seed=seed, max_words=None)
+    compute = {
+        "random": cw.compute_crossword,
+        "backtracking": cw.compute_crossword_backtracking,
+        "annealing": cw.compute_crossword_annealing,
+    }[engine]
+    start = time.perf_counter()
+    result = compute(time_permitted)
+    elapsed = time.perf_counter() - start
+    return {
+        "engine": engine,
+        "words": len(words),
+        "size": size,
+        "seed": seed,
+        "time_budget": time_permitted,
+        "elapsed": round(elapsed, 4),
+        "iterations": cw.iterations,
+        "iterations_per_sec": round(cw.iterations / elapsed, 1) if elapsed else None,
+        "candidates": cw.candidates_evaluated,
+        "candidates_per_sec": round(cw.candidates_evaluated / elapsed, 1) if elapsed else None,
+        "words_total": len(cw._base_wordlist()),
+        "words_placed": len(result["words"]),
+        "score": cw.best_score,
+    }
+
+
+def run(word_counts=WORD_COUNTS, sizes=GRID_SIZES, seeds=SEEDS, engines=ENGINES,
+        time_permitted: float = 1.0, log=None) -> Dict[str, Any]:
+    """Run the whole matrix and return the JSON-serialisable report."""
+    corpus = load_corpus()
+    results = []
+    for count in word_counts:
+        words = word_list(corpus, count)
+        for size in sizes:
+            for engine in engines:
+                for seed in seeds:
+                    case = run_case(engine, words, size, seed, time_permitted)
+                    results.append(case)
+                    if log is not None:
+                        log("%(engine)s words=%(words)d size=%(size)d seed=%(seed)d: "
+                            "%(words_placed)d/%(words_total)d placed, score %(score)s, "
+                            "%(iterations_per_sec)s it/s" % case)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": getattr(np, "__version__", None),
+            "time_budget": time_permitted,
+            "corpus_words": len(corpus),
+        },
+        "results": results,
+    }
+
+
+def _case_key(case: Dict[str, Any]) -> Tuple:
+    return (case["engine"], case["words"], case["size"], case["seed"])
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.1) -> Dict[str, Any]:
+    """
+    Compare two reports case by case. A metric regresses when the current value is
+    lower than the baseline by more than `tolerance` (a fraction of the baseline).
+    """
+    base_cases = {_case_key(c): c for c in baseline.get("results", [])}
+    regressions = []
+    compared = 0
+    for case in current.get("results", []):
+        base = base_cases.get(_case_key(case))
+        if base is None:
+            continue
+        compared += 1
+        for metric in COMPARED_METRICS:
+            old, new = base.get(metric), case.get(metric)
+            if old is None or new is None:
+                continue
+            if new < old - tolerance * abs(old):
+                regressions.append({
+                    "engine": case["engine"],
+                    "words": case["words"],
+                    "size": case["size"],
+                    "seed": case["seed"],
+                    "metric": metric,
+                    "baseline": old,
+                    "current": new,
+                    "change": round((new - old) / abs(old), 4) if old else None,
+                })
+    return {"compared": compared, "tolerance": tolerance, "regressions": regressions}
+
+
+def check_vectorized(grids: int = 50, words: int = 60, sizes=GRID_SIZES[:2], seed: int = 0) -> Dict[str, Any]:
+    """
+    Compare the NumPy candidate search with the scalar one on random grids: for every
+    word of the list, get_coords_vectorized must return the same placements as the
+    scalar get_coords (as a set; the scalar path may list a placement once per anchor).
+    """
+    if np is None:
+        raise RuntimeError("NumPy is not installed")
+    corpus = load_corpus()
+    rng = random.Random(seed)
+    mismatches = []
+    compared = 0
+    for i in range(grids):
+        picked = [(word, "Petunjuk " + word.lower()) for word in rng.sample(corpus, words)]
+        size = rng.choice(sizes)
+        cw = Crossword(rows=size, cols=size, available_words=picked, seed=seed + i, max_words=None, use_numpy=False)
+        cw.compute_crossword(0.05)
+        cw._load_words(cw.best_wordlist)
+        for wd in cw._base_wordlist():
+            cw.use_numpy = False
+            scalar = set(cw.get_coords(wd) or ())
+            vectorized = set(cw.get_coords_vectorized(wd) or ())
+            compared += 1
+            if scalar != vectorized:
+                mismatches.append({
+                    "grid": i,
+                    "size": size,
+                    "word": wd.word,
+                    "scalar_only": sorted(scalar - vectorized),
+                    "vectorized_only": sorted(vectorized - scalar),
+                })
+    return {"grids": grids, "compared": compared, "mismatches": mismatches}
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m crossword.benchmark", description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="run the benchmark matrix and print a JSON report")
+    run_p.add_argument("--words", type=int, nargs="+", default=list(WORD_COUNTS))
+    run_p.add_argument("--sizes", type=int, nargs="+", default=list(GRID_SIZES))
+    run_p.add_argument("--seeds", type=int, nargs="+", default=list(SEEDS))
+    run_p.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    run_p.add_argument("--time", type=float, default=1.0, help="time budget per run in seconds")
+    run_p.add_argument("--output", help="write the report to this file instead of stdout")
+    run_p.add_argument("--quiet", action="store_true", help="do not log progress to stderr")
+
+    cmp_p = sub.add_parser("compare", help="flag regressions of a report against a saved baseline")
+    cmp_p.add_argument("baseline")
+    cmp_p.add_argument("current")
+    cmp_p.add_argument("--tolerance", type=float, default=0.1)
+
+    check_p = sub.add_parser("check", help="check the NumPy candidate search against the scalar one")
+    check_p.add_argument("--grids", type=int, default=50)
+    check_p.add_argument("--words", type=int, default=60)
+    check_p.add_argument("--sizes", type=int, nargs="+", default=list(GRID_SIZES[:2]))
+    check_p.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        log = None if args.quiet else (lambda msg: print(msg, file=sys.stderr))
+        report = run(args.words, args.sizes, args.seeds, args.engines, args.time, log=log)
+        text = json.dumps(report, indent=2)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as fh:
+                fh.write(text + "\n")
+        else:
+            print(text)
+        return 0
+
+    if args.command == "check":
+        report = check_vectorized(args.grids, args.words, args.sizes, args.seed)
+        print(json.dumps(report, indent=2))
+        return 1 if report["mismatches"] else 0
+
+    report = compare(_load(args.baseline), _load(args.current), args.tolerance)
+    print(json.dumps(report, indent=2))
+    return 1 if report["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
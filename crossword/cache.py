@@ -0,0 +1,113 @@
+"""
+Content-addressed cache for generation results.
+
+A result is keyed by the SHA-256 of the normalised (word, clue) list and the generator
+parameters (grid size, word limit, engine, seed, time budget), so pressing generate
+again on the same list returns the stored layout; a different seed gives another one.
+Entries live in a size-bounded in-memory LRU and, optionally, in a directory of JSON
+files that several worker processes can share.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+def result_key(words: Iterable[Tuple[str, Optional[str]]], **params: Any) -> str:
+    """Hex digest identifying a generation request; word order and case do not matter."""
+    normalized = sorted((w.strip().upper(), (c or "").strip()) for w, c in words)
+    payload = json.dumps({"words": normalized, "params": params}, sort_keys=True,
+                         separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    LRU of up to `max_entries` results in memory. With `directory`, results are also
+    written there (at most `max_disk_entries` files, oldest evicted first) and read
+    back on a memory miss.
+    """
+
+    def __init__(self, max_entries: int = 256, directory: Optional[str] = None, max_disk_entries: int = 4096):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_entries = max_disk_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+        result = self._read(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._remember(key, result)
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]):
+        with self._lock:
+            self._remember(key, result)
+        self._write(key, result)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key: str, result: Dict[str, Any]):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as fh:
+                result = json.load(fh)
+            os.utime(path)  # recently used files are evicted last
+            return result
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, key: str, result: Dict[str, Any]):
+        if not self.directory:
+            return
+        try:
+            # write then rename, so other processes never read a partial file
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(result, fh, ensure_ascii=False)
+            os.replace(tmp, self._path(key))
+            self._evict_disk()
+        except OSError:
+            pass  # the disk tier is best effort
+
+    def _evict_disk(self):
+        entries = [e for e in os.scandir(self.directory) if e.name.endswith(".json")]
+        if len(entries) <= self.max_disk_entries:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_disk_entries]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
@@ -1,26 +1,127 @@
 """
 Modified version of Crossword generator from https://github.com/sealhuang/pycrossword
 """
+import math
+import multiprocessing
+import os
 import random
+import threading
 import time
 from collections import defaultdict
-from dataclasses import dataclass, asdict
-from typing import List, Optional, Tuple, Dict, Any
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor, TimeoutError as FutureTimeout,
+                                as_completed, wait)
+from typing import Callable, List, Optional, Tuple, Dict, Any
+
+try:
+    import numpy as np
+except ImportError:  # optional: vectorized candidate evaluation
+    np = None
 
 # -------------------------
 # Data structures
 # -------------------------
-@dataclass
+# score contribution of an occupied cell by its number of occupied neighbours (see _score_grid)
+CELL_WEIGHT = (-1, 1, 3, 3, 3)
+# automatic NumPy mode: only grids with more cells than this, and only once at least one word
+# is placed per NUMPY_CELLS_PER_WORD cells (sparser grids are cheaper to scan via the word index)
+NUMPY_MIN_CELLS = 15 * 15
+NUMPY_CELLS_PER_WORD = 8
+# words used per run by default (longest first) and the sizes the generator is tuned for:
+# up to MAX_GRID_SIZE x MAX_GRID_SIZE grids and MAX_WORDS words still complete restarts
+# well within a one second budget (see crossword/benchmark.py)
+DEFAULT_MAX_WORDS = 30
+MAX_GRID_SIZE = 50
+MAX_WORDS = 500
+# seconds between best-layout updates sent back by a pool worker (see compute_crossword_offloaded)
+PROGRESS_INTERVAL = 0.25
+
 class WordDef:
-    word: str
-    clue: Optional[str] = None
-    row: Optional[int] = None   # start row (0-indexed)
-    col: Optional[int] = None   # start col (0-indexed)
-    vertical: Optional[bool] = None
+    """A word with its clue and, once placed, its start cell and orientation (slotted record)."""
+    __slots__ = ("word", "clue", "row", "col", "vertical")
+
+    def __init__(self, word: str, clue: Optional[str] = None, row: Optional[int] = None,
+                 col: Optional[int] = None, vertical: Optional[bool] = None):
+        self.word = word
+        self.clue = clue
+        self.row = row              # start row (0-indexed)
+        self.col = col              # start col (0-indexed)
+        self.vertical = vertical
 
     def copy_shallow(self):
         return WordDef(self.word, self.clue, self.row, self.col, self.vertical)
 
+    def _key(self):
+        return (self.word, self.clue, self.row, self.col, self.vertical)
+
+    def __eq__(self, other):
+        if not isinstance(other, WordDef):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __repr__(self):
+        return "WordDef(word=%r, clue=%r, row=%r, col=%r, vertical=%r)" % self._key()
+
+
+# -------------------------
+# Run budget / progress
+# -------------------------
+class _Run:
+    """Deadline, iteration budget, early-exit targets and progress reporting for one compute_* call."""
+
+    def __init__(self, cw: "Crossword", total: int, time_permitted: float, max_iterations: Optional[int] = None,
+                 target_score: Optional[int] = None, target_fill: Optional[float] = None,
+                 progress: Optional[Callable[[Dict[str, Any]], None]] = None, stop_event: Optional[Any] = None):
+        self.cw = cw
+        # placed counts include the pinned words (see Crossword.pin_words)
+        total += len(cw.fixed_words)
+        self.total = total
+        self.start = time.time()
+        self.deadline = self.start + float(time_permitted)
+        self.max_iterations = max_iterations
+        self.target_score = target_score
+        # number of placed words that ends the run early (every word by default)
+        self.target_words = total if target_fill is None else min(total, math.ceil(total * float(target_fill)))
+        self.progress = progress
+        self.stop_event = stop_event
+        cw.iterations = 0
+
+    def tick(self):
+        self.cw.iterations += 1
+
+    def reached(self) -> bool:
+        """True once the best layout meets the word-count or score target."""
+        cw = self.cw
+        if cw.best_grid is None:
+            return False
+        if len(cw.best_wordlist) >= self.target_words:
+            return True
+        return self.target_score is not None and cw.best_score >= self.target_score
+
+    def finished(self) -> bool:
+        """True when the run should stop: target reached, budget spent, or another worker reached the target."""
+        if self.reached():
+            if self.stop_event is not None:
+                self.stop_event.set()
+            return True
+        if self.stop_event is not None and self.stop_event.is_set():
+            return True
+        if self.max_iterations is not None and self.cw.iterations >= self.max_iterations:
+            return True
+        return time.time() >= self.deadline
+
+    def improved(self):
+        """Report the new best layout to the progress callback."""
+        if self.progress is None:
+            return
+        cw = self.cw
+        self.progress({
+            "score": cw.best_score,
+            "words_placed": len(cw.best_wordlist),
+            "words_total": self.total,
+            "iterations": cw.iterations,
+            "elapsed": time.time() - self.start,
+        })
+
 
 # -------------------------
 # Crossword generator
@@ -29,32 +130,228 @@ class Crossword:
     """
     Improved crossword generator based on the GitHub snippet.
     Usage:
-        cw = Crossword(rows=15, cols=15, available_words=[("apple","clue"), ...])
-        cw.compute_crossword(time_permitted=2.0)
+        cw = Crossword(rows=15, cols=15, available_words=[("apple","clue"), ...], seed=42)
+        # large themed grids: Crossword(rows=50, cols=50, available_words=bank, max_words=None)
+        cw.compute_crossword(time_permitted=2.0, max_iterations=500, target_fill=0.9)
         result = cw.to_json()
     """
 
-    def __init__(self, rows: int = 15, cols: int = 15, empty: str = ' ', available_words: Optional[List[Tuple[str, str]]] = None):
+    def __init__(self, rows: int = 15, cols: int = 15, empty: str = ' ', available_words: Optional[List[Tuple[str, str]]] = None,
+                 use_numpy: Optional[bool] = None, seed: Optional[int] = None,
+                 max_words: Optional[int] = DEFAULT_MAX_WORDS):
         self.rows = int(rows)
         self.cols = int(cols)
         self.empty = empty
+        # longest words used per run; None uses every word that fits the grid
+        self.max_words = max_words
+        # per-generator RNG: the same seed and budget reproduce the same layout
+        self.seed = seed
+        self.random = random.Random(seed)
+        # None: decide per call (see NUMPY_MIN_CELLS); always falls back without NumPy
+        self.use_numpy = use_numpy
         # normalize available words into WordDef list (do not mutate caller list)
         aw = available_words or []
         self.available_words: List[WordDef] = [WordDef(w.strip().upper(), (c.strip() if c is not None else None)) for w, c in aw]
-        self.let_coords: Dict[str, List[Tuple[int, int, bool]]] = defaultdict(list)
-        self.grid: List[List[str]] = []
+        # letter -> {(r, c, vertical_flag_of_PLACED_WORD): number of placed words contributing it}
+        self.let_coords: Dict[str, Dict[Tuple[int, int, bool], int]] = defaultdict(dict)
+        # compact grid: one byte per cell holding an interned letter code (0 == empty)
+        self._codes: Dict[str, int] = {}
+        self._letters: List[str] = [self.empty]
+        for wd in self.available_words:
+            for ch in wd.word:
+                self._code(ch)
+        # placed words in placement order; doubles as the undo log for _rollback
         self.current_wordlist: List[WordDef] = []
-        self.best_wordlist: List[WordDef] = []
-        self.best_grid: List[List[str]] = []
+        # placements fixed by pin_words: always the first entries of current_wordlist, never moved
+        self.fixed_words: List[WordDef] = []
+        # iterations (restarts, search nodes or moves) used by the last compute_* call
+        self.iterations = 0
+        # candidate placements examined by get_coords (benchmark counter, never reset automatically)
+        self.candidates_evaluated = 0
+        # word -> ((letter, offsets of that letter in the word), ...), built per run
+        self._word_index: Optional[Dict[str, Tuple[Tuple[str, Tuple[int, ...]], ...]]] = None
+        self._resize(self.rows, self.cols)
 
     # -------------------------
     # Helpers / initialization
     # -------------------------
+    def _resize(self, rows: int, cols: int):
+        """(Re)allocate every per-cell buffer for a rows x cols grid, empty, with no best layout."""
+        self.rows = rows
+        self.cols = cols
+        self._cells = bytearray(rows * cols)
+        # occupancy bitboards: bit c of _row_mask[r] / bit r of _col_mask[c] is set when (r, c) holds a letter
+        self._row_mask: List[int] = [0] * rows
+        self._col_mask: List[int] = [0] * cols
+        # incremental scoring: occupied-neighbour count of every cell and the running cell score
+        self._neighbors = bytearray(rows * cols)
+        self._cell_score = 0
+        # number of placed words covering each cell (2 on crossings) so removal keeps shared letters
+        self._uses = bytearray(rows * cols)
+        self._zeros = bytes(rows * cols)
+        self._zero_rows = [0] * rows
+        self._zero_cols = [0] * cols
+        self.current_wordlist.clear()
+        self.let_coords.clear()
+        # best solution snapshot: the placed (never mutated) records plus the flat cell buffer
+        self._reset_best()
+
     def _clear(self):
-        self.grid = [[self.empty for _ in range(self.cols)] for _ in range(self.rows)]
-        self.current_wordlist = []
+        # reset every buffer in place (no reallocation between restarts)
+        zeros = self._zeros
+        self._cells[:] = zeros
+        self._neighbors[:] = zeros
+        self._uses[:] = zeros
+        self._row_mask[:] = self._zero_rows
+        self._col_mask[:] = self._zero_cols
+        self._cell_score = 0
+        self.current_wordlist.clear()
         self.let_coords.clear()
 
+    def _code(self, ch: str) -> int:
+        """Return the byte code for a letter, interning it on first use."""
+        code = self._codes.get(ch)
+        if code is None:
+            code = len(self._letters)
+            if code > 255:
+                raise ValueError("Too many distinct letters for the compact grid (max 255)")
+            self._codes[ch] = code
+            self._letters.append(ch)
+        return code
+
+    def _load_cells(self, cells: bytes):
+        """
+        Replace the grid contents with a flat cell buffer and rebuild masks and score state.
+        Word placements are not known here, so every letter counts as used by one word;
+        use _load_words when the placements are available.
+        """
+        self._cells[:] = bytes(self.rows * self.cols)
+        self._row_mask = [0] * self.rows
+        self._col_mask = [0] * self.cols
+        self._neighbors[:] = bytes(self.rows * self.cols)
+        self._cell_score = 0
+        for idx, code in enumerate(cells):
+            if code:
+                r, c = divmod(idx, self.cols)
+                self._fill_cell(r, c, code)
+        self._uses[:] = bytes(1 if code else 0 for code in self._cells)
+
+    def _load_words(self, words: List[WordDef]):
+        """Reset the grid and place the given (already positioned) words."""
+        if words is self.current_wordlist or words == self.current_wordlist:
+            return
+        self._clear()
+        for wd in words:
+            self.set_word(wd, wd.row, wd.col, wd.vertical)
+
+    def pin_words(self, placements: List[Tuple[str, Optional[str], int, int, bool]]) -> List[Tuple[str, Optional[str]]]:
+        """
+        Fix already-placed words, given as (word, clue, row, col, vertical), for the following
+        compute_* runs: they are laid out first with set_word and never moved, so only the
+        other available words are searched. Replaces any earlier pins. Placements that are
+        out of bounds or conflict with an earlier pin are returned as (word, clue) and added
+        to available_words to be searched like the others.
+        """
+        self.fixed_words = []
+        self._clear()
+        rejected = []
+        for word, clue, row, col, vertical in placements:
+            wd = WordDef(word.strip().upper(), clue.strip() if clue is not None else None)
+            if not self.set_word(wd, int(row), int(col), bool(vertical)):
+                rejected.append((wd.word, wd.clue))
+                if all(aw.word != wd.word for aw in self.available_words):
+                    self.available_words.append(wd)
+        self.fixed_words = list(self.current_wordlist)
+        return rejected
+
+    def _rollback(self, mark: int = 0):
+        """
+        Undo placements until only the first `mark` words remain, but never below the
+        pinned words. Every set_word is an entry of the undo log (current_wordlist), so
+        this costs O(letters removed) instead of reallocating the grid. Undoing
+        everything resets the buffers in place.
+        """
+        words = self.current_wordlist
+        pinned = self.fixed_words
+        if mark <= len(pinned):
+            if not pinned:
+                self._clear()
+                return
+            if words[:len(pinned)] != pinned:
+                # the grid was cleared or replaced: lay the pinned words out again
+                self._clear()
+                for wd in pinned:
+                    self.set_word(wd, wd.row, wd.col, wd.vertical)
+                return
+            mark = len(pinned)
+        while len(words) > mark:
+            self._unplace(words.pop())
+
+    def _fill_cell(self, r: int, c: int, code: int):
+        """Write a letter code into an empty cell, updating masks, neighbour counts and score."""
+        cols = self.cols
+        idx = r * cols + c
+        cells = self._cells
+        nb = self._neighbors
+        cells[idx] = code
+        self._row_mask[r] |= 1 << c
+        self._col_mask[c] |= 1 << r
+        delta = CELL_WEIGHT[nb[idx]]
+        for n_idx in self._adjacent(r, c, idx):
+            n = nb[n_idx]
+            if cells[n_idx]:
+                delta += CELL_WEIGHT[n + 1] - CELL_WEIGHT[n]
+            nb[n_idx] = n + 1
+        self._cell_score += delta
+
+    def _clear_cell(self, r: int, c: int):
+        """Empty an occupied cell, updating masks, neighbour counts and score."""
+        cols = self.cols
+        idx = r * cols + c
+        cells = self._cells
+        nb = self._neighbors
+        cells[idx] = 0
+        self._row_mask[r] &= ~(1 << c)
+        self._col_mask[c] &= ~(1 << r)
+        delta = -CELL_WEIGHT[nb[idx]]
+        for n_idx in self._adjacent(r, c, idx):
+            n = nb[n_idx]
+            if cells[n_idx]:
+                delta += CELL_WEIGHT[n - 1] - CELL_WEIGHT[n]
+            nb[n_idx] = n - 1
+        self._cell_score += delta
+
+    def _adjacent(self, r: int, c: int, idx: int) -> List[int]:
+        """Flat indices of the in-bounds orthogonal neighbours of (r, c)."""
+        cols = self.cols
+        out = []
+        if r > 0:
+            out.append(idx - cols)
+        if r + 1 < self.rows:
+            out.append(idx + cols)
+        if c > 0:
+            out.append(idx - 1)
+        if c + 1 < cols:
+            out.append(idx + 1)
+        return out
+
+    @property
+    def grid(self) -> List[List[str]]:
+        """The grid as a 2D list of single-character strings (a fresh copy)."""
+        letters = self._letters
+        cells = self._cells
+        cols = self.cols
+        return [[letters[code] for code in cells[r * cols:(r + 1) * cols]] for r in range(self.rows)]
+
+    @grid.setter
+    def grid(self, value: List[List[str]]):
+        cells = bytearray(self.rows * self.cols)
+        for r, row in enumerate(value[:self.rows]):
+            for c, ch in enumerate(row[:self.cols]):
+                if ch != self.empty:
+                    cells[r * self.cols + c] = self._code(ch)
+        self._load_cells(cells)
+
     def prep_grid_words(self):
         """Prepare a fresh grid and place the first seed word."""
         self._clear()
@@ -65,67 +362,496 @@ class Crossword:
         # seed first word (prefer vertical center)
         self.first_word(self.available_words[0])
 
+    def _base_wordlist(self) -> List[WordDef]:
+        # keep a deterministic order by default: longest first, skipping words that cannot fit
+        # and pinned words (already on the grid)
+        longest = max(self.rows, self.cols)
+        pinned = {w.word for w in self.fixed_words}
+        base_wordlist = sorted((w for w in self.available_words if len(w.word) <= longest and w.word not in pinned),
+                               key=lambda w: len(w.word), reverse=True)
+
+        # limiting a long list to the top max_words keeps small grids fast and dense
+        # (pinned words do not count towards it)
+        if self.max_words is not None:
+            return base_wordlist[:self.max_words]
+        return base_wordlist
+
+    def _build_word_index(self, wordlist: List[WordDef]):
+        """
+        Bucket the letters of every word of the run once: word -> ((letter, offsets), ...).
+        get_coords matches these buckets against the letter-bucketed open crossings on the
+        board (let_coords), so building is linear in the word list and each lookup costs
+        O(placed letters) regardless of grid area or list length.
+        """
+        index: Dict[str, Tuple[Tuple[str, Tuple[int, ...]], ...]] = {}
+        for wd in wordlist:
+            if wd.word not in index:
+                offsets: Dict[str, List[int]] = defaultdict(list)
+                for i, ch in enumerate(wd.word):
+                    offsets[ch].append(i)
+                index[wd.word] = tuple((ch, tuple(idx)) for ch, idx in offsets.items())
+        self._word_index = index
+
     # -------------------------
     # Public compute API
     # -------------------------
-    def compute_crossword(self, time_permitted: float = 1.0):
+    def compute_crossword(self, time_permitted: float = 1.0, stop_event: Optional[Any] = None, *,
+                          max_iterations: Optional[int] = None, target_score: Optional[int] = None,
+                          target_fill: Optional[float] = None, progress: Optional[Callable[[Dict[str, Any]], None]] = None):
         """
         Attempt to build the best crossword within the time limit.
+        Stops at the deadline, after max_iterations restarts, or as soon as the best
+        layout places target_fill of the words (all of them by default) or scores at
+        least target_score. progress is called with a stats dict after each improvement
+        (see _Run.improved); best_to_json() renders the best layout at any time.
+        stop_event (anything with is_set()/set(), e.g. a multiprocessing Event)
+        lets cooperating workers stop each other once the target is reached.
         Returns structured JSON (same as to_json).
         """
-        time_permitted = float(time_permitted)
-        start = time.time()
-        self.best_wordlist = []
-        self.best_grid = None
+        base_wordlist = self._base_wordlist()
+        run = _Run(self, len(base_wordlist), time_permitted, max_iterations, target_score, target_fill, progress, stop_event)
+        self._reset_best()
+        self._build_word_index(base_wordlist)
+        self._restarts(run, base_wordlist)
 
-        # keep a deterministic order by default: longest first
-        base_wordlist = sorted(self.available_words, key=lambda w: len(w.word), reverse=True)
+        # restore best into object
+        self._load_words(self.best_wordlist)
 
-        # If the list is long, limiting to top N helps quality and speed
-        MAX_USE_WORDS = min(len(base_wordlist), 30)
-        base_wordlist = base_wordlist[:MAX_USE_WORDS]
+        return self.to_json()
 
-        while (time.time() - start) < time_permitted:
-            # fresh grid & words copy
-            self._clear()
-            # deep-ish copy of words list (shallow dataclass copies)
-            self.current_wordlist = []
-            self.let_coords.clear()
-            working = [wd.copy_shallow() for wd in base_wordlist]
+    def _restarts(self, run: "_Run", base_wordlist: List[WordDef], until: Optional[float] = None,
+                  until_iterations: Optional[int] = None):
+        """
+        Random-restart loop shared by compute_crossword and the annealing warm-up,
+        which also ends its phase at time `until` or after `until_iterations` restarts.
+        """
+        # always run at least one restart so a tight deadline still yields a layout
+        while True:
+            # fresh grid (pinned words only): undo the previous restart's placements in place
+            self._rollback(0)
+            # base words are only read, never mutated, so the restart reorders references
+            working = list(base_wordlist)
 
             # randomize order (but keep longer words early sometimes)
-            if random.random() < 0.5:
-                random.shuffle(working)
+            if self.random.random() < 0.5:
+                self.random.shuffle(working)
 
-            # seed and attempt to add words (two passes helps)
-            if working:
+            # seed (unless pinned words are there to cross) and attempt to add words (two passes helps)
+            if working and not self.current_wordlist:
                 self.first_word(working[0])
-                for _ in range(2):  # two passes to try different placements
-                    for w in working:
-                        if not any(x.word == w.word for x in self.current_wordlist):
-                            self.add_words(w)
+            placed = {x.word for x in self.current_wordlist}
+            for _ in range(2):  # two passes to try different placements
+                for w in working:
+                    if w.word not in placed and self.add_words(w):
+                        placed.add(w.word)
+            run.tick()
 
-            # score candidate
-            score = self._score_grid()
-            best_score = self._score_grid(self.best_grid) if self.best_grid is not None else -1
-            if score > best_score:
-                # store copies for best solution
-                self.best_grid = [row[:] for row in self.grid]
-                self.best_wordlist = [wd.copy_shallow() for wd in self.current_wordlist]
-
-            # early exit if we placed all words
-            if len(self.best_wordlist) == len(base_wordlist):
+            # score candidate (maintained incrementally; best score is cached)
+            if self.best_score is None or self._score_grid() > self.best_score:
+                self._save_best(run)
+
+            # early exit on target (or another worker reached it), budget or phase end
+            if run.finished() or (until is not None and time.time() >= until):
+                break
+            if until_iterations is not None and self.iterations >= until_iterations:
+                break
+
+    def _reset_best(self):
+        self.best_wordlist = []
+        self.best_grid = None
+        self.best_score = None
+
+    def _save_best(self, run: Optional["_Run"] = None):
+        """Snapshot the live layout as the best one: placed records are immutable, so no copies."""
+        self.best_score = self._score_grid()
+        self.best_grid = bytes(self._cells)
+        self.best_wordlist = list(self.current_wordlist)
+        if run is not None:
+            run.improved()
+
+    def compute_crossword_parallel(self, time_permitted: float = 1.0, workers: Optional[int] = None, *,
+                                   max_iterations: Optional[int] = None, target_score: Optional[int] = None,
+                                   target_fill: Optional[float] = None, progress: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Run independent random restarts on a shared process pool and keep the best grid.
+        Each worker gets its own seed (derived from this generator's RNG), the same
+        deadline and targets, and an equal share of max_iterations; all of them stop as
+        soon as one reaches the target. progress is called as worker layouts improve
+        on the best so far (workers send theirs at most every PROGRESS_INTERVAL seconds),
+        and best_to_json() then returns that layout. Falls back to compute_crossword for a single worker.
+        Returns structured JSON (same as to_json).
+        """
+        limits = dict(target_score=target_score, target_fill=target_fill)
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1:
+            return self.compute_crossword(time_permitted, max_iterations=max_iterations, progress=progress, **limits)
+
+        deadline = time.time() + float(time_permitted)
+        words = [(wd.word, wd.clue) for wd in self.available_words]
+        fixed = [(wd.word, wd.clue, wd.row, wd.col, wd.vertical) for wd in self.fixed_words]
+        total = len(fixed) + len(self._base_wordlist())
+        base_seed = self.random.randrange(2 ** 32)
+        per_worker = None if max_iterations is None else max(1, math.ceil(max_iterations / workers))
+        pool, manager = get_pool(workers)
+        stop_event = manager.Event()
+        # worker seed -> (score, layout) of that worker's best so far, when progress is wanted
+        shared = manager.dict() if progress is not None else None
+        futures = [
+            pool.submit(_restart_worker, self.rows, self.cols, self.empty, words, self.max_words, deadline,
+                        base_seed + i, stop_event, per_worker, limits, fixed, shared)
+            for i in range(workers)
+        ]
+
+        start = time.time()
+        best = None
+        iterations = 0
+
+        def offer(score, result):
+            nonlocal best
+            if best is not None and score <= best[0]:
+                return
+            best = (score, result)
+            if progress is not None:
+                # the callback reads the worker's layout through best_to_json()
+                self._adopt(result)
+                progress({
+                    "score": score,
+                    "words_placed": len(result["words"]),
+                    "words_total": total,
+                    "iterations": iterations,
+                    "elapsed": time.time() - start,
+                })
+
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+            for fut in done:
+                score, worker_iterations, result = fut.result()
+                iterations += worker_iterations
+                offer(score, result)
+            if shared is not None and pending:
+                for score, result in shared.values():
+                    offer(score, result)
+
+        score, result = best
+        self._adopt(result)
+        self.iterations = iterations
+        return self.to_json()
+
+    def compute_crossword_offloaded(self, engine: str = "backtracking", time_permitted: float = 1.0,
+                                    workers: Optional[int] = None, *,
+                                    progress: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Run compute_crossword_backtracking or compute_crossword_annealing (engine
+        'backtracking' or 'annealing') for this generator's words, pins and seed in a
+        process of the shared pool, so a long search does not hold this process's GIL,
+        and take over its layout. progress is called with the worker's stats at most
+        every PROGRESS_INTERVAL seconds, and best_to_json() then returns its best layout.
+        Returns structured JSON (same as to_json).
+        """
+        if engine not in ("backtracking", "annealing"):
+            raise ValueError("Unknown engine: %s" % engine)
+        words = [(wd.word, wd.clue) for wd in self.available_words]
+        fixed = [(wd.word, wd.clue, wd.row, wd.col, wd.vertical) for wd in self.fixed_words]
+        pool, manager = get_pool(workers)
+        shared = manager.dict() if progress is not None else None
+        fut = pool.submit(_engine_worker, engine, self.rows, self.cols, self.empty, words, self.max_words,
+                          self.seed, fixed, float(time_permitted), shared)
+        reported = 0
+        while True:
+            try:
+                iterations, result = fut.result(timeout=PROGRESS_INTERVAL)
                 break
+            except FutureTimeout:
+                pass
+            if shared is not None:
+                update = shared.get("progress")
+                if update is not None and update[0] != reported:
+                    reported, stats, best = update
+                    self._adopt(best)
+                    progress(stats)
+        self._adopt(result)
+        self.iterations = iterations
+        return self.to_json()
+
+    def _adopt(self, result: Dict[str, Any]):
+        """Make a to_json() layout of the same grid size (e.g. from a pool worker) the live and best one."""
+        self._load_words([
+            WordDef(w["word"], w["clue"], w["row"], w["col"], w["vertical"]) for w in result["words"]
+        ])
+        self._save_best()
+
+    def compute_crossword_fit(self, time_permitted: float = 1.0, workers: Optional[int] = None, *,
+                              target_fill: Optional[float] = None, trim: bool = True):
+        """
+        Auto-fit: look for the smallest square grid, up to the configured rows x cols, whose
+        layout places every word (or target_fill of them) and keep that layout, trimmed to
+        its bounding box (see trim). With several workers the candidate sizes run side by
+        side on the shared pool; otherwise a shrinking binary search splits the budget.
+        Falls back to the best full-size layout when no size reaches the target.
+        Returns structured JSON (same as to_json) for the fitted grid.
+        """
+        # every size is laid out from scratch, so earlier pins no longer apply
+        self.fixed_words = []
+        base_wordlist = self._base_wordlist()
+        total = len(base_wordlist)
+        target_words = total if target_fill is None else min(total, math.ceil(total * float(target_fill)))
+        full = (self.rows, self.cols)
+        if not base_wordlist:
+            # no word fits: the empty full-size grid, as the other engines return
+            self._resize(*full)
+            self.iterations = 0
+            self._save_best()
+            return self.to_json()
+        # no square below the longest word (it would drop that word) or the letter count
+        lo = max([1] + [len(w.word) for w in base_wordlist]
+                 + [math.ceil(math.sqrt(sum(len(w.word) for w in base_wordlist)))])
+        squares = [(n, n) for n in range(lo, min(full))]
+        words = [(wd.word, wd.clue) for wd in self.available_words]
+        limits = dict(target_fill=target_fill)
+        deadline = time.time() + float(time_permitted)
+        base_seed = self.random.randrange(2 ** 32)
+        workers = workers or os.cpu_count() or 1
+        results: Dict[Tuple[int, int], Tuple[int, Dict[str, Any]]] = {}
+        self.iterations = 0
+
+        def record(size, outcome):
+            score, iterations, result = outcome
+            self.iterations += iterations
+            results[size] = (score, result)
+            return len(result["words"]) >= target_words
+
+        if workers > 1 and squares:
+            # one pool task per candidate size, spread evenly between the bounds
+            step = max(1, math.ceil(len(squares) / (workers - 1)))
+            sizes = squares[::step][:workers - 1] + [full]
+            pool, _ = get_pool(workers)
+            futures = {
+                pool.submit(_restart_worker, rows, cols, self.empty, words, self.max_words, deadline,
+                            base_seed + i, None, None, limits): (rows, cols)
+                for i, (rows, cols) in enumerate(sizes)
+            }
+            for fut in as_completed(futures):
+                record(futures[fut], fut.result())
+        else:
+            def trial(size, share):
+                budget = max(0.0, deadline - time.time()) / share
+                return record(size, _restart_worker(size[0], size[1], self.empty, words, self.max_words,
+                                                    time.time() + budget, base_seed + len(results), None,
+                                                    None, limits))
+
+            # the full size first (fallback), then bisect the smaller squares
+            left, right = 0, len(squares) - 1
+            if trial(full, 1 + math.ceil(math.log2(len(squares) + 1))):
+                while left <= right:
+                    mid = (left + right) // 2
+                    if trial(squares[mid], math.ceil(math.log2(right - left + 2))):
+                        right = mid - 1
+                    else:
+                        left = mid + 1
+
+        fitting = [size for size, (_, result) in results.items() if len(result["words"]) >= target_words]
+        if fitting:
+            size = min(fitting, key=lambda rc: (rc[0] * rc[1], rc))
+        else:
+            size = max(results, key=lambda rc: (len(results[rc][1]["words"]), results[rc][0]))
+        result = results[size][1]
+        self._resize(*size)
+        self._load_words([
+            WordDef(w["word"], w["clue"], w["row"], w["col"], w["vertical"]) for w in result["words"]
+        ])
+        self._save_best()
+        if trim:
+            self.trim()
+        return self.to_json()
+
+    def trim(self):
+        """
+        Shrink the grid to the bounding box of the placed words, dropping empty border
+        rows and columns, and shift the word coordinates to match.
+        """
+        words = self.current_wordlist
+        if not words:
+            return
+        top = min(wd.row for wd in words)
+        left = min(wd.col for wd in words)
+        bottom = max(wd.row + (len(wd.word) - 1 if wd.vertical else 0) for wd in words)
+        right = max(wd.col + (0 if wd.vertical else len(wd.word) - 1) for wd in words)
+        shifted = [WordDef(wd.word, wd.clue, wd.row - top, wd.col - left, wd.vertical) for wd in words]
+        self._resize(bottom - top + 1, right - left + 1)
+        self._load_words(shifted)
+        self._save_best()
+
+    def compute_crossword_backtracking(self, time_permitted: float = 1.0, *, max_iterations: Optional[int] = None,
+                                       target_score: Optional[int] = None, target_fill: Optional[float] = None,
+                                       progress: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Deterministic alternative to the random-restart loop: depth-first search with
+        backtracking. At every node the unplaced word with the fewest legal placements
+        is branched on first (placements tried best score first, then "defer it until
+        another word is placed"), placements are undone with remove_word, and a branch
+        is pruned as soon as it cannot place more words than the best layout found so far.
+        The tree is walked as a limited discrepancy search: pass k only explores paths
+        that leave the heuristic's first choice at most k times, so an early bad choice
+        is revisited quickly instead of after the whole subtree below it.
+        Stops when the target is reached (every word placed by default), the tree is
+        exhausted, or the time limit or max_iterations (search nodes) is reached; the
+        other options behave as in compute_crossword.
+        Returns structured JSON (same as to_json).
+        """
+        base_wordlist = self._base_wordlist()
+        run = _Run(self, len(base_wordlist), time_permitted, max_iterations, target_score, target_fill, progress)
+        self._reset_best()
+        self._build_word_index(base_wordlist)
+
+        def record():
+            placed = len(self.current_wordlist)
+            score = self._score_grid()
+            if (self.best_grid is None or placed > len(self.best_wordlist)
+                    or (placed == len(self.best_wordlist) and score > self.best_score)):
+                self._save_best(run)
+
+        done = run.finished
+
+        def search(remaining: List[WordDef], deferred: frozenset, budget: int) -> bool:
+            """Returns True if some branch was skipped for lack of discrepancy budget."""
+            run.tick()
+            if len(self.current_wordlist) + len(remaining) <= len(self.best_wordlist):
+                return False  # cannot beat the best word count
+            if done():
+                # out of budget on the way down: keep what this path has placed
+                record()
+                return False
+            # most constrained word first
+            best_word, best_moves = None, None
+            for wd in remaining:
+                if id(wd) in deferred:
+                    continue
+                if done():
+                    # scoring every remaining word is the costly part of a node on large lists
+                    record()
+                    return False
+                moves = list(dict.fromkeys((r, c, v) for r, c, v, _ in (self.get_coords(wd) or [])))
+                if moves and (best_moves is None or len(moves) < len(best_moves)):
+                    best_word, best_moves = wd, moves
+                    if len(moves) == 1:
+                        break
+            if best_word is None:
+                record()
+                return False
+            rest = [wd for wd in remaining if wd is not best_word]
+            cut = False
+            # branch i costs i discrepancies; the last branch defers the word
+            for i, move in enumerate(best_moves + [None]):
+                if i > budget:
+                    return True
+                if move is None:
+                    cut |= search(remaining, deferred | {id(best_word)}, budget - i)
+                elif self.set_word(best_word, *move):
+                    # the grid changed, so deferred words get another chance
+                    cut |= search(rest, frozenset(), budget - i)
+                    self._rollback(len(self.current_wordlist) - 1)
+                if done():
+                    break
+            return cut
+
+        budget = 0
+        while base_wordlist and not done():
+            cut = False
+            if self.fixed_words:
+                # the pinned words are the root: search the others around them
+                self._rollback(0)
+                cut = search(base_wordlist, frozenset(), budget)
+            else:
+                seed, others = base_wordlist[0], base_wordlist[1:]
+                length = len(seed.word)
+                # seed the longest word in the centre, vertical first as in first_word
+                for vertical in (True, False):
+                    self._clear()
+                    if vertical:
+                        placed = self.set_word(seed, max(0, (self.rows - length) // 2), self.cols // 2, True)
+                    else:
+                        placed = self.set_word(seed, self.rows // 2, max(0, (self.cols - length) // 2), False)
+                    if placed:
+                        cut |= search(others, frozenset(), budget)
+                    if done():
+                        break
+            if not cut:
+                break  # the whole tree was explored
+            budget += 1
 
-        # fallback if nothing placed
         if self.best_grid is None:
-            self.best_grid = [row[:] for row in self.grid]
-            self.best_wordlist = [wd.copy_shallow() for wd in self.current_wordlist]
+            self._rollback(0)
+            self._save_best()
 
         # restore best into object
-        self.grid = [row[:] for row in self.best_grid]
-        self.current_wordlist = [wd.copy_shallow() for wd in self.best_wordlist]
+        self._load_words(self.best_wordlist)
+        return self.to_json()
+
+    def compute_crossword_annealing(self, time_permitted: float = 1.0, drop_fraction: float = 0.12,
+                                    start_temperature: float = 4.0, end_temperature: float = 0.05, *,
+                                    max_iterations: Optional[int] = None, target_score: Optional[int] = None,
+                                    target_fill: Optional[float] = None,
+                                    progress: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Large-neighbourhood search with a simulated-annealing acceptance rule.
+        Spends a fifth of the budget (time and iterations) on random restarts for a
+        starting layout, then repeatedly drops a fraction of the words (relax_grid, which
+        also drops words the removal left side by side, plus words left without a
+        crossing), re-adds unplaced words with add_words, and keeps the change if it
+        scores better, or worse with probability exp(delta / T). T cools geometrically
+        from start_temperature to end_temperature over the time budget. Rejected moves
+        are undone incrementally. Restarts and moves both count towards max_iterations;
+        the stopping targets and progress behave as in compute_crossword.
+        Returns structured JSON (same as to_json).
+        """
+        time_permitted = float(time_permitted)
+        base_wordlist = self._base_wordlist()
+        run = _Run(self, len(base_wordlist), time_permitted, max_iterations, target_score, target_fill, progress)
+        self._reset_best()
+        self._build_word_index(base_wordlist)
+        warmup_iterations = None if max_iterations is None else max(1, max_iterations // 5)
+        self._restarts(run, base_wordlist, until=run.start + time_permitted * 0.2, until_iterations=warmup_iterations)
+        self._load_words(self.best_wordlist)
+        current_score = self._score_grid()
+
+        while not run.finished():
+            elapsed = min(1.0, (time.time() - run.start) / time_permitted) if time_permitted > 0 else 1.0
+            temperature = start_temperature * (end_temperature / start_temperature) ** elapsed
 
+            # destroy
+            removed = self.relax_grid(drop_fraction)
+            removed += self._drop_orphans()
+            mark = len(self.current_wordlist)
+
+            # repair
+            placed = {x.word for x in self.current_wordlist}
+            working = [w for w in base_wordlist if w.word not in placed]
+            self.random.shuffle(working)
+            if not self.current_wordlist and working:
+                self.first_word(working[0])
+                placed.add(working[0].word)
+            for _ in range(2):
+                for w in working:
+                    if w.word not in placed and self.add_words(w):
+                        placed.add(w.word)
+
+            run.tick()
+
+            score = self._score_grid()
+            delta = score - current_score
+            if delta >= 0 or self.random.random() < math.exp(delta / temperature):
+                current_score = score
+                if score > self.best_score:
+                    self._save_best(run)
+            else:
+                # reject: undo the repair, then put the destroyed words back
+                self._rollback(mark)
+                for wd in removed:
+                    self.set_word(wd, wd.row, wd.col, wd.vertical)
+
+        # restore best into object
+        self._load_words(self.best_wordlist)
         return self.to_json()
 
     # -------------------------
@@ -137,42 +863,134 @@ class Crossword:
         list of tuples (row, col, vertical, score), sorted descending by score.
         If none, return None.
         """
+        if self._vectorize():
+            return self.get_coords_vectorized(word)
         candidates: List[Tuple[int, int, bool, int]] = []
         w = word.word
         length = len(w)
-        # iterate each letter position in word, look up that letter on board
+        buckets = self._word_index.get(w) if self._word_index is not None else None
+        if buckets is not None:
+            # match the word's letter buckets against the board's letters; a cell already
+            # covered by two words is a crossing and cannot anchor another one
+            uses = self._uses
+            cols = self.cols
+            evaluated = 0
+            for ch, offsets in buckets:
+                anchors = self.let_coords.get(ch)
+                if not anchors:
+                    continue
+                for (r, c, placed_vertical) in anchors:
+                    if uses[r * cols + c] > 1:
+                        continue
+                    evaluated += len(offsets)
+                    if placed_vertical:
+                        # placed word is vertical -> candidate horizontal placement on the crossing row
+                        for letter_index in offsets:
+                            start_col = c - letter_index
+                            if 0 <= start_col <= cols - length:
+                                score = self.check_score_horiz(w, r, start_col, length)
+                                if score:
+                                    candidates.append((r, start_col, False, score))
+                    else:
+                        # placed word is horizontal -> candidate vertical placement on the crossing column
+                        for letter_index in offsets:
+                            start_row = r - letter_index
+                            if 0 <= start_row <= self.rows - length:
+                                score = self.check_score_vert(w, start_row, c, length)
+                                if score:
+                                    candidates.append((start_row, c, True, score))
+            self.candidates_evaluated += evaluated
+            return self._sorted_candidates(candidates)
+
+        # no index for this word: iterate each letter position in word, look up that letter on board
         for letter_index, ch in enumerate(w):
-            coords_for_letter = self.let_coords.get(ch, [])
+            coords_for_letter = self.let_coords.get(ch, {})
             if not coords_for_letter:
                 continue
+            self.candidates_evaluated += len(coords_for_letter)
             for (r, c, placed_vertical) in coords_for_letter:
-                # if letter in placed word was vertical, candidate is horizontal (and vice versa)
-                # compute potential start cell depending on orientation
-                # try horizontal placement (crossing a vertical)
+                # the candidate crosses the placed letter in the other orientation
                 if placed_vertical:
-                    start_row = r - letter_index
-                    start_col = c
-                    if not (0 <= start_row <= self.rows - length):
-                        continue
-                    if not (0 <= start_col <= self.cols - length):
-                        continue
-                    if 0 <= start_row <= self.rows - length:
-                        score = self.check_score_horiz(w, start_row, start_col, length)
+                    # placed letter is part of a vertical word -> candidate horizontal placement
+                    start_col = c - letter_index
+                    if 0 <= start_col <= self.cols - length:
+                        score = self.check_score_horiz(w, r, start_col, length)
                         if score:
-                            candidates.append((start_row, start_col, False, score))
+                            candidates.append((r, start_col, False, score))
                 else:
                     # placed letter was horizontal -> candidate vertical placement
-                    start_row = r
-                    start_col = c - letter_index
-                    if not (0 <= start_row <= self.rows - length):
-                        continue
-                    if not (0 <= start_col <= self.cols - length):
-                        continue
-                    if 0 <= start_col <= self.cols - length:
-                        score = self.check_score_vert(w, start_row, start_col, length)
+                    start_row = r - letter_index
+                    if 0 <= start_row <= self.rows - length:
+                        score = self.check_score_vert(w, start_row, c, length)
                         if score:
-                            candidates.append((start_row, start_col, True, score))
+                            candidates.append((start_row, c, True, score))
 
+        return self._sorted_candidates(candidates)
+
+    def _vectorize(self) -> bool:
+        if np is None or self.use_numpy is False:
+            return False
+        if self.use_numpy:
+            return True
+        cells = self.rows * self.cols
+        return cells > NUMPY_MIN_CELLS and len(self.current_wordlist) * NUMPY_CELLS_PER_WORD >= cells
+
+    def get_coords_vectorized(self, word: WordDef) -> Optional[List[Tuple[int, int, bool, int]]]:
+        """
+        NumPy batch version of get_coords: evaluates every start position of the word in
+        both orientations in one pass (letter matches, end caps, side adjacency) and
+        returns each legal crossing placement once, in the same (row, col, vertical, score)
+        format. Requires NumPy.
+        """
+        codes = np.array([self._code(ch) for ch in word.word], dtype=np.uint8)
+        grid = np.frombuffer(self._cells, dtype=np.uint8).reshape(self.rows, self.cols)
+        candidates: List[Tuple[int, int, bool, int]] = []
+        for vertical in (False, True):
+            # vertical placements are horizontal placements on the transposed grid
+            g = grid.T if vertical else grid
+            scores = self._vector_scores(g, codes)
+            if scores is None:
+                continue
+            self.candidates_evaluated += scores.size
+            rows, cols = np.nonzero(scores)
+            for a, b, score in zip(rows.tolist(), cols.tolist(), scores[rows, cols].tolist()):
+                candidates.append((b, a, True, score) if vertical else (a, b, False, score))
+        return self._sorted_candidates(candidates)
+
+    @staticmethod
+    def _vector_scores(g, codes):
+        """
+        Score of a horizontal placement of `codes` starting at every (row, col) of grid g,
+        0 where the placement is illegal or crosses nothing. None if the word does not fit.
+        """
+        n_rows, n_cols = g.shape
+        length = len(codes)
+        starts = n_cols - length + 1
+        if starts <= 0:
+            return None
+        occupied = g != 0
+        padded = np.zeros((n_rows + 2, n_cols + 2), dtype=bool)
+        padded[1:-1, 1:-1] = occupied
+        windows = np.lib.stride_tricks.sliding_window_view(g, length, axis=1)
+        match = windows == codes
+        free = windows == 0
+        # letters must match or the cell must be empty
+        legal = (match | free).all(axis=2)
+        # two letters in a row along the word mean it runs along a placed word
+        legal &= ~(match[..., 1:] & match[..., :-1]).any(axis=2)
+        # cells just before and after the word must be empty
+        legal &= ~padded[1:-1, 0:starts]
+        legal &= ~padded[1:-1, length + 1:length + 1 + starts]
+        # empty cells must not touch letters above or below
+        touching = padded[:-2, 1:-1] | padded[2:, 1:-1]
+        touch_windows = np.lib.stride_tricks.sliding_window_view(touching, length, axis=1)
+        legal &= ~(free & touch_windows).any(axis=2)
+        crossings = match.sum(axis=2)
+        legal &= crossings > 0
+        return np.where(legal, crossings + 1, 0)
+
+    @staticmethod
+    def _sorted_candidates(candidates: List[Tuple[int, int, bool, int]]) -> Optional[List[Tuple[int, int, bool, int]]]:
         if not candidates:
             return None
         # sort by score descending and return
@@ -189,13 +1007,13 @@ class Crossword:
         w = word.word
         length = len(w)
         # prefer vertical in center to encourage crossings
-        vertical = True if random.random() < 0.75 else False
+        vertical = True if self.random.random() < 0.75 else False
         if vertical:
             row = max(0, (self.rows - length) // 2)
-            col = random.randint(0, max(0, self.cols - 1))
+            col = self.random.randint(0, max(0, self.cols - 1))
         else:
             col = max(0, (self.cols - length) // 2)
-            row = random.randint(0, max(0, self.rows - 1))
+            row = self.random.randint(0, max(0, self.rows - 1))
         # bounds check
         row = min(max(0, row), self.rows - (length if vertical else 1))
         col = min(max(0, col), self.cols - (1 if vertical else length))
@@ -218,12 +1036,12 @@ class Crossword:
         weights = [c[3] for c in top_candidates]
         # if all weights equal, fallback to uniform
         if max(weights) == min(weights):
-            choice = random.choice(top_candidates)
+            choice = self.random.choice(top_candidates)
         else:
             # normalize weights to probabilities (plus small epsilon)
             total = sum(weights) + 1e-6
             probs = [w / total for w in weights]
-            choice = random.choices(top_candidates, weights=probs, k=1)[0]
+            choice = self.random.choices(top_candidates, weights=probs, k=1)[0]
 
         row, col, vertical, score = choice
         # only set if valid (extra safety)
@@ -240,77 +1058,61 @@ class Crossword:
     # Scoring & placement checks
     # -------------------------
     def check_score_horiz(self, word_str: str, row: int, col: int, length: int, score: int = 1) -> int:
-        # ensure before/after indices are in bounds when checked
-        if col - 1 >= 0:
-            if not (0 <= row < self.rows and 0 <= (col - 1) < self.cols):
-                return 0
-            if self.cell_occupied(row, col - 1):
-                return 0
-        if col + length < self.cols:
-            if not (0 <= row < self.rows and 0 <= (col + length) < self.cols):
-                return 0
-            if self.cell_occupied(row, col + length):
-                return 0
-
-        for i in range(length):
-            r = row
-            c = col + i
-            # defensive bounds check
-            if not (0 <= r < self.rows and 0 <= c < self.cols):
-                return 0
-
-            active_cell = self.grid[r][c]
-            ch = word_str[i]
-            if active_cell == self.empty:
-                # prevent touching vertically
-                if (r - 1 >= 0 and 0 <= (r - 1) < self.rows and 0 <= c < self.cols and self.cell_occupied(r - 1, c)) \
-                or (r + 1 < self.rows and 0 <= (r + 1) < self.rows and 0 <= c < self.cols and self.cell_occupied(r + 1, c)):
-                    return 0
-            elif active_cell == ch:
-                score += 1
-            else:
-                return 0
-        return score
-
+        if not (0 <= row < self.rows and 0 <= col and col + length <= self.cols):
+            return 0
+        occupied = self._row_mask[row]
+        span = ((1 << length) - 1) << col
+        # cells just before and after the word must be empty
+        if occupied & ((span << 1) | (span >> 1)) & ~span:
+            return 0
+        # empty cells of the span must not touch letters above or below
+        free = span & ~occupied
+        above = self._row_mask[row - 1] if row > 0 else 0
+        below = self._row_mask[row + 1] if row + 1 < self.rows else 0
+        if free & (above | below):
+            return 0
+        return self._score_crossings(word_str, occupied & span, row * self.cols, 1, col, score)
 
     def check_score_vert(self, word_str: str, row: int, col: int, length: int, score: int = 1) -> int:
-        # before/after checks
-        if row - 1 >= 0:
-            if not (0 <= (row - 1) < self.rows and 0 <= col < self.cols):
-                return 0
-            if self.cell_occupied(row - 1, col):
-                return 0
-        if row + length < self.rows:
-            if not (0 <= (row + length) < self.rows and 0 <= col < self.cols):
-                return 0
-            if self.cell_occupied(row + length, col):
-                return 0
-
-        for i in range(length):
-            r = row + i
-            c = col
-            # defensive bounds check
-            if not (0 <= r < self.rows and 0 <= c < self.cols):
-                return 0
+        if not (0 <= col < self.cols and 0 <= row and row + length <= self.rows):
+            return 0
+        occupied = self._col_mask[col]
+        span = ((1 << length) - 1) << row
+        # cells just before and after the word must be empty
+        if occupied & ((span << 1) | (span >> 1)) & ~span:
+            return 0
+        # empty cells of the span must not touch letters left or right
+        free = span & ~occupied
+        left = self._col_mask[col - 1] if col > 0 else 0
+        right = self._col_mask[col + 1] if col + 1 < self.cols else 0
+        if free & (left | right):
+            return 0
+        return self._score_crossings(word_str, occupied & span, col, self.cols, row, score)
 
-            active_cell = self.grid[r][c]
-            ch = word_str[i]
-            if active_cell == self.empty:
-                # prevent touching horizontally
-                if (c - 1 >= 0 and 0 <= r < self.rows and 0 <= (c - 1) < self.cols and self.cell_occupied(r, c - 1)) \
-                or (c + 1 < self.cols and 0 <= r < self.rows and 0 <= (c + 1) < self.cols and self.cell_occupied(r, c + 1)):
-                    return 0
-            elif active_cell == ch:
-                score += 1
-            else:
+    def _score_crossings(self, word_str: str, crossing: int, base: int, stride: int, start: int, score: int) -> int:
+        """
+        Check the letters under the set bits of `crossing` (a row or column mask) against word_str.
+        Bit b maps to cell index base + b * stride and to word_str[b - start].
+        Returns score plus one per matching crossing, or 0 on any mismatch or when two
+        crossings are adjacent (the span would run along a placed word).
+        """
+        if crossing & (crossing >> 1):
+            return 0
+        cells = self._cells
+        codes = self._codes
+        while crossing:
+            low = crossing & -crossing
+            b = low.bit_length() - 1
+            if cells[base + b * stride] != codes.get(word_str[b - start]):
                 return 0
+            crossing ^= low
+            score += 1
         return score
 
-
     def cell_occupied(self, row: int, col: int) -> bool:
         if not (0 <= row < self.rows and 0 <= col < self.cols):
             return False
-        return self.grid[row][col] != self.empty
+        return bool((self._row_mask[row] >> col) & 1)
 
     # -------------------------
     # Setting words into grid
@@ -329,29 +1131,31 @@ class Crossword:
         else:
             if col < 0 or col + length > self.cols:
                 return False
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return False
 
         # Final validation against existing grid to avoid overwriting mismatches
-        for i, ch in enumerate(s):
-            r = row + i if vertical else row
-            c = col if vertical else col + i
-            if not (0 <= r < self.rows and 0 <= c < self.cols):
-                return False 
-            
-        for i, ch in enumerate(s):
-            r = row + i if vertical else row
-            c = col if vertical else col + i
-            if self.grid[r][c] != self.empty and self.grid[r][c] != ch:
+        cells = self._cells
+        step = self.cols if vertical else 1
+        base = row * self.cols + col
+        codes = [self._code(ch) for ch in s]
+        for i, code in enumerate(codes):
+            existing = cells[base + i * step]
+            if existing and existing != code:
                 return False
 
-        # Place letters and update let_coords
+        # Place letters (crossing cells are already filled) and update let_coords
         for i, ch in enumerate(s):
             r = row + i if vertical else row
             c = col if vertical else col + i
-            self.grid[r][c] = ch
-            # store letter coordinate (letter -> list of (r,c,vertical_flag_of_PLACED_WORD))
+            if not cells[base + i * step]:
+                self._fill_cell(r, c, codes[i])
+            self._uses[base + i * step] += 1
+            # store letter coordinate (letter -> (r,c,vertical_flag_of_PLACED_WORD))
             # placed word's orientation is vertical
-            if (r, c, vertical) not in self.let_coords[ch]:
-                self.let_coords[ch].append((r, c, vertical))
+            entries = self.let_coords[ch]
+            key = (r, c, vertical)
+            entries[key] = entries.get(key, 0) + 1
 
         # register word in current word list (store placement)
         placed = WordDef(word.word, word.clue, row, col, vertical)
@@ -361,71 +1165,151 @@ class Crossword:
     # -------------------------
     # Scoring & utilities
     # -------------------------
-    def _score_grid(self, grid_override: Optional[List[List[str]]] = None) -> int:
+    def _score_grid(self, grid_override: Optional[bytes] = None) -> int:
         """
         Score grid by counting intersections and penalizing isolated letters.
-        Higher is better.
+        Higher is better. The live grid's score is maintained incrementally by
+        _fill_cell/_clear_cell; grid_override (a flat cell snapshot such as
+        best_grid) is scored with a full scan.
         """
-        G = grid_override if grid_override is not None else self.grid
+        if grid_override is None:
+            return self._cell_score + len(self.current_wordlist) * 2
+        row_mask = [0] * self.rows
+        for idx, code in enumerate(grid_override):
+            if code:
+                r, c = divmod(idx, self.cols)
+                row_mask[r] |= 1 << c
         score = 0
         for r in range(self.rows):
-            for c in range(self.cols):
-                if G[r][c] == self.empty:
-                    continue
-                neighbors = 0
-                if r > 0 and G[r - 1][c] != self.empty:
-                    neighbors += 1
-                if r + 1 < self.rows and G[r + 1][c] != self.empty:
-                    neighbors += 1
-                if c > 0 and G[r][c - 1] != self.empty:
-                    neighbors += 1
-                if c + 1 < self.cols and G[r][c + 1] != self.empty:
-                    neighbors += 1
-                if neighbors >= 2:
-                    score += 3   # intersection gives higher weight
-                elif neighbors == 1:
-                    score += 1   # continuation
-                else:
-                    score -= 1   # isolated letter (penalize)
+            occupied = row_mask[r]
+            if not occupied:
+                continue
+            above = row_mask[r - 1] if r > 0 else 0
+            below = row_mask[r + 1] if r + 1 < self.rows else 0
+            left = occupied << 1    # bit c set when (r, c-1) is occupied
+            right = occupied >> 1   # bit c set when (r, c+1) is occupied
+            # per-cell neighbour count via bit-sliced addition of the four neighbour masks
+            ones = twos = 0
+            for m in (above, below, left, right):
+                m &= occupied
+                twos |= ones & m
+                ones ^= m
+            # ones|twos: at least one neighbour; twos: a carry occurred -> at least two
+            many = twos
+            one = ones & ~twos
+            isolated = occupied & ~(ones | twos)
+            score += 3 * bin(many).count("1")     # intersection gives higher weight
+            score += bin(one).count("1")          # continuation
+            score -= bin(isolated).count("1")     # isolated letter (penalize)
         # minor boost for number of placed words
         score += len(self.current_wordlist) * 2
         return score
 
-    def relax_grid(self, drop_fraction: float = 0.12):
+    def relax_grid(self, drop_fraction: float = 0.12) -> List[WordDef]:
         """
-        Optionally remove a few words randomly to escape local maxima.
-        Not used by default in compute_crossword, but available.
+        Remove a few distinct words at random to escape local maxima
+        (the destroy step of compute_crossword_annealing). Returns the removed words.
         """
-        if not self.current_wordlist:
-            return
-        drop_count = max(1, int(len(self.current_wordlist) * drop_fraction))
-        for _ in range(drop_count):
-            w = random.choice(self.current_wordlist)
+        movable = self.current_wordlist[len(self.fixed_words):]
+        if not movable:
+            return []
+        drop_count = min(len(movable), max(1, int(len(self.current_wordlist) * drop_fraction)))
+        dropped = self.random.sample(movable, drop_count)
+        for w in dropped:
             self.remove_word(w)
+        # two words that both crossed a dropped one may be left side by side
+        return dropped + self._drop_unchecked()
+
+    @staticmethod
+    def _runs(masks: List[int]):
+        """(line, start, length) of every run of two or more letters in a list of row or column masks."""
+        for line, m in enumerate(masks):
+            while m:
+                start = (m & -m).bit_length() - 1
+                shifted = m >> start
+                # trailing ones of shifted: the run length
+                length = ((shifted + 1) & ~shifted).bit_length() - 1
+                if length > 1:
+                    yield line, start, length
+                m &= ~(((1 << length) - 1) << start)
+
+    def invalid_runs(self) -> List[Tuple[int, int, bool, int]]:
+        """
+        Grid validity check: every run of two or more adjacent letters, across or down,
+        must be exactly one placed word. Returns the runs that are not, as
+        (row, col, vertical, length); empty for a valid grid.
+        """
+        placed = {(wd.row, wd.col, wd.vertical, len(wd.word)) for wd in self.current_wordlist}
+        invalid = [(r, c, False, n) for r, c, n in self._runs(self._row_mask) if (r, c, False, n) not in placed]
+        invalid += [(r, c, True, n) for c, r, n in self._runs(self._col_mask) if (r, c, True, n) not in placed]
+        return invalid
+
+    def _drop_unchecked(self) -> List[WordDef]:
+        """
+        Remove (unpinned) words, latest placed first, until invalid_runs() finds nothing
+        or only pinned words are involved. Returns the removed words.
+        """
+        removed = []
+        skip = set()
+        while True:
+            runs = [run for run in self.invalid_runs() if run not in skip]
+            if not runs:
+                return removed
+            row, col, vertical, length = runs[0]
+            cells = {(row + i, col) if vertical else (row, col + i) for i in range(length)}
+            victim = None
+            for wd in reversed(self.current_wordlist[len(self.fixed_words):]):
+                if any(((wd.row + i, wd.col) if wd.vertical else (wd.row, wd.col + i)) in cells
+                       for i in range(len(wd.word))):
+                    victim = wd
+                    break
+            if victim is None:
+                skip.add(runs[0])  # formed by pinned words alone: not ours to fix
+                continue
+            self.remove_word(victim)
+            removed.append(victim)
+
+    def _drop_orphans(self) -> List[WordDef]:
+        """Remove (unpinned) placed words that no longer cross any other word. Returns the removed words."""
+        if len(self.current_wordlist) <= 1:
+            return []
+        orphans = []
+        for wd in self.current_wordlist[len(self.fixed_words):]:
+            step = self.cols if wd.vertical else 1
+            base = wd.row * self.cols + wd.col
+            if all(self._uses[base + i * step] < 2 for i in range(len(wd.word))):
+                orphans.append(wd)
+        for wd in orphans:
+            self.remove_word(wd)
+        return orphans
 
     def remove_word(self, word_def: WordDef):
         """Remove a placed word from current grid and cleanup let_coords."""
-        s = word_def.word
-        if word_def not in self.current_wordlist:
-            return
-        
-        for i, ch in enumerate(s):
-            r = word_def.row + i if word_def.vertical else word_def.row
-            c = word_def.col if word_def.vertical else word_def.col + i
-            # clear cell only if no other crossing letter remains (simple approach: clear)
-            # For simplicity, we'll clear and later rebuild let_coords from current_wordlist
-            self.grid[r][c] = self.empty
-        # remove from list
-        self.current_wordlist = [w for w in self.current_wordlist if w.word != word_def.word or w.row != word_def.row or w.col != word_def.col]
-        # rebuild let_coords from current_wordlist (cheap but correct)
-        self.let_coords.clear()
-        for wd in self.current_wordlist:
-            s2 = wd.word
-            for i, ch in enumerate(s2):
-                rr = wd.row + i if wd.vertical else wd.row
-                cc = wd.col if wd.vertical else wd.col + i
-                if (rr, cc, wd.vertical) not in self.let_coords[ch]:
-                    self.let_coords[ch].append((rr, cc, wd.vertical))
+        words = self.current_wordlist
+        for i in range(len(words) - 1, -1, -1):
+            if words[i] is word_def or words[i] == word_def:
+                self._unplace(words.pop(i))
+                return
+
+    def _unplace(self, word_def: WordDef):
+        """Undo the grid and let_coords changes of one placement in O(word length)."""
+        vertical = word_def.vertical
+        for i, ch in enumerate(word_def.word):
+            r = word_def.row + i if vertical else word_def.row
+            c = word_def.col if vertical else word_def.col + i
+            # clear cell only if no other crossing word still uses it
+            idx = r * self.cols + c
+            if self._uses[idx]:
+                self._uses[idx] -= 1
+                if not self._uses[idx]:
+                    self._clear_cell(r, c)
+            entries = self.let_coords.get(ch)
+            key = (r, c, vertical)
+            if entries and key in entries:
+                if entries[key] > 1:
+                    entries[key] -= 1
+                else:
+                    del entries[key]
 
     # -------------------------
     # Output / serialization
@@ -436,8 +1320,24 @@ class Crossword:
         'grid' is a 2D array of single-character strings (empty -> self.empty).
         'words' is a list of dicts with word/clue/row/col/vertical.
         """
+        return self._json(self.grid, self.current_wordlist)
+
+    def best_to_json(self) -> Optional[Dict[str, Any]]:
+        """
+        Same structure as to_json() for the best layout found so far, without touching
+        the live grid; usable from a progress callback while a compute_* call runs.
+        Returns None before the first layout is recorded.
+        """
+        if self.best_grid is None:
+            return None
+        letters = self._letters
+        cols = self.cols
+        grid = [[letters[code] for code in self.best_grid[r * cols:(r + 1) * cols]] for r in range(self.rows)]
+        return self._json(grid, self.best_wordlist)
+
+    def _json(self, grid: List[List[str]], wordlist: List[WordDef]) -> Dict[str, Any]:
         words_out = []
-        for wd in self.current_wordlist:
+        for wd in wordlist:
             words_out.append({
                 "word": wd.word,
                 "clue": wd.clue,
@@ -447,7 +1347,7 @@ class Crossword:
             })
         return {
             "size": {"rows": self.rows, "cols": self.cols},
-            "grid": self.grid,
+            "grid": grid,
             "words": words_out,
         }
 
@@ -456,6 +1356,99 @@ class Crossword:
         return "\n".join("".join(ch if ch != self.empty else ' ' for ch in row) for row in self.grid)
 
 
+# -------------------------
+# Parallel restarts
+# -------------------------
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_manager = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(workers: Optional[int] = None):
+    """
+    Return the process-wide (ProcessPoolExecutor, Manager) pair used by
+    compute_crossword_parallel, creating it on first use so that later
+    requests do not pay process startup. The pool is recreated if more
+    workers are requested than it currently has.
+    """
+    global _pool, _pool_workers, _manager
+    workers = workers or os.cpu_count() or 1
+    with _pool_lock:
+        if _pool is None or workers > _pool_workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # spawn keeps worker processes independent of the (possibly threaded) web server
+            ctx = multiprocessing.get_context("spawn")
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx)
+            _pool_workers = workers
+            if _manager is None:
+                _manager = ctx.Manager()
+        return _pool, _manager
+
+
+def shutdown_pool():
+    """Stop the shared worker pool (e.g. at process exit or in tests)."""
+    global _pool, _pool_workers, _manager
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+        if _manager is not None:
+            _manager.shutdown()
+        _pool, _pool_workers, _manager = None, 0, None
+
+
+def _restart_worker(rows: int, cols: int, empty: str, words: List[Tuple[str, str]], max_words: Optional[int],
+                    deadline: float, seed: int, stop_event, max_iterations: Optional[int],
+                    limits: Dict[str, Any], fixed=None, shared=None) -> Tuple[int, int, Dict[str, Any]]:
+    """
+    Pool task: run restarts until the shared deadline and return (best score, restarts, to_json()).
+    With a shared dict, the best layout so far is published in it as shared[seed] = (score, layout).
+    """
+    cw = Crossword(rows=rows, cols=cols, empty=empty, available_words=words, seed=seed, max_words=max_words)
+    if fixed:
+        cw.pin_words(fixed)
+    progress = None
+    if shared is not None:
+        sent = [0.0]
+
+        def progress(stats):
+            now = time.time()
+            if now - sent[0] >= PROGRESS_INTERVAL:
+                sent[0] = now
+                shared[seed] = (cw.best_score, cw.best_to_json())
+
+    cw.compute_crossword(time_permitted=max(0.0, deadline - time.time()), stop_event=stop_event,
+                         max_iterations=max_iterations, progress=progress, **limits)
+    return cw.best_score, cw.iterations, cw.to_json()
+
+
+def _engine_worker(engine: str, rows: int, cols: int, empty: str, words: List[Tuple[str, str]],
+                   max_words: Optional[int], seed: Optional[int], fixed, time_permitted: float,
+                   shared) -> Tuple[int, Dict[str, Any]]:
+    """
+    Pool task for compute_crossword_offloaded: run one engine and return (iterations, to_json()).
+    With a shared dict, progress is published in it as (update number, stats, best layout).
+    """
+    cw = Crossword(rows=rows, cols=cols, empty=empty, available_words=words, seed=seed, max_words=max_words)
+    if fixed:
+        cw.pin_words(fixed)
+    progress = None
+    if shared is not None:
+        sent = [0, 0.0]
+
+        def progress(stats):
+            now = time.time()
+            if now - sent[1] >= PROGRESS_INTERVAL:
+                sent[0] += 1
+                sent[1] = now
+                shared["progress"] = (sent[0], stats, cw.best_to_json())
+
+    compute = cw.compute_crossword_backtracking if engine == "backtracking" else cw.compute_crossword_annealing
+    compute(time_permitted=time_permitted, progress=progress)
+    return cw.iterations, cw.to_json()
+
+
 # -------------------------
 # Example usage (comment out in production)
 # -------------------------
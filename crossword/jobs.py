@@ -0,0 +1,163 @@
+"""
+Background crossword generation jobs.
+
+Request handlers submit a generator call to a JobQueue and return at once; the call runs
+on a small local thread pool (bounded concurrency) and reports its best layout so far,
+which a status endpoint can poll until the final layout is ready.
+"""
+import math
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class QueueFull(Exception):
+    """Raised by JobQueue.submit when a pending-job limit is reached; retry_after is in seconds."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Job:
+    """One submitted generation: status, latest progress stats, best layout so far and result."""
+
+    def __init__(self, owner: Optional[Any] = None):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.status = "queued"          # queued -> running -> done | failed
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.progress: Optional[Dict[str, Any]] = None
+        self.best: Optional[Dict[str, Any]] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+
+    def report(self, stats: Dict[str, Any], best: Optional[Dict[str, Any]] = None):
+        """Progress hook for the running call: latest stats and, if known, the best layout so far."""
+        self.progress = stats
+        if best is not None:
+            self.best = best
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "progress": self.progress,
+            "best": self.best,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """
+    Runs jobs on `workers` threads; further submissions wait in the executor's queue.
+    Admission control: at most `max_pending` queued or running jobs in the process and
+    `max_pending_per_owner` per owner, beyond which submit raises QueueFull.
+    Finished jobs are kept for `keep_for` seconds so their result can still be fetched.
+    """
+
+    def __init__(self, workers: int = 2, keep_for: float = 600.0, max_pending: Optional[int] = None,
+                 max_pending_per_owner: Optional[int] = None):
+        self.workers = workers
+        self.keep_for = keep_for
+        self.max_pending = max_pending
+        self.max_pending_per_owner = max_pending_per_owner
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crossword-job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        # queued + running jobs, in total and per owner
+        self._pending = 0
+        self._pending_by_owner: Dict[Any, int] = {}
+        self._running = 0
+        # exponential moving average of job run time, for Retry-After estimates
+        self._avg_duration = 1.0
+        self.counters = {"submitted": 0, "completed": 0, "failed": 0, "cached": 0,
+                         "rejected_busy": 0, "rejected_owner": 0}
+
+    def submit(self, fn: Callable[[Job], Dict[str, Any]], owner: Optional[Any] = None) -> Job:
+        """
+        Queue fn(job), whose return value becomes job.result; returns the job immediately.
+        Raises QueueFull when the process or the owner already has too many pending jobs.
+        """
+        job = Job(owner)
+        with self._lock:
+            if self.max_pending is not None and self._pending >= self.max_pending:
+                self.counters["rejected_busy"] += 1
+                raise QueueFull("Generator is busy", self._retry_after(self._pending))
+            owner_pending = self._pending_by_owner.get(owner, 0)
+            if self.max_pending_per_owner is not None and owner_pending >= self.max_pending_per_owner:
+                self.counters["rejected_owner"] += 1
+                raise QueueFull("Too many generations in progress", self._retry_after(owner_pending))
+            self._expire()
+            self._jobs[job.id] = job
+            self._pending += 1
+            self._pending_by_owner[owner] = owner_pending + 1
+            self.counters["submitted"] += 1
+        self._executor.submit(self._run, job, fn)
+        return job
+
+    def pending(self) -> int:
+        """Queued and running jobs in this process."""
+        return self._pending
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.counters, workers=self.workers, pending=self._pending, running=self._running,
+                        queued=self._pending - self._running, avg_duration=round(self._avg_duration, 3))
+
+    def _retry_after(self, ahead: int) -> int:
+        # time until `ahead` jobs have drained through the workers
+        return max(1, math.ceil(ahead / self.workers * self._avg_duration))
+
+    def complete(self, result: Dict[str, Any], owner: Optional[Any] = None) -> Job:
+        """Register an already finished job (e.g. a cached result) so it can be fetched like any other."""
+        job = Job(owner)
+        job.status = "done"
+        job.started = job.finished = job.created
+        job.result = result
+        with self._lock:
+            self._expire()
+            self._jobs[job.id] = job
+            self.counters["cached"] += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job: Job, fn: Callable[[Job], Dict[str, Any]]):
+        with self._lock:
+            self._running += 1
+        job.status = "running"
+        job.started = time.time()
+        try:
+            job.result = fn(job)
+            job.status = "done"
+        except Exception as e:  # reported through the status endpoint
+            job.error = str(e) or e.__class__.__name__
+            job.status = "failed"
+        finally:
+            job.finished = time.time()
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+                left = self._pending_by_owner[job.owner] - 1
+                if left:
+                    self._pending_by_owner[job.owner] = left
+                else:
+                    del self._pending_by_owner[job.owner]
+                self.counters["completed" if job.status == "done" else "failed"] += 1
+                self._avg_duration += 0.2 * ((job.finished - job.started) - self._avg_duration)
+
+    def _expire(self):
+        cutoff = time.time() - self.keep_for
+        for job_id in [j.id for j in self._jobs.values() if j.finished is not None and j.finished < cutoff]:
+            del self._jobs[job_id]
@@ -0,0 +1,181 @@
+"""
+In-place schema migrations for the SQLite database.
+
+db.create_all() creates missing tables but never changes existing ones. Each migration
+here brings an older database up to what models.py declares. SQLite's PRAGMA user_version
+records how far a database has got, so only newer migrations run. Every step is also
+idempotent (columns and indexes are checked first), which matters for two reasons: a
+fresh database made by create_all() already has the current schema, and an interrupted
+run can simply be repeated.
+
+check_query_plans() runs EXPLAIN QUERY PLAN on the hot queries of the routes and
+reports any that scan a table or sort without an index.
+
+Usage:
+    python migrations.py            # migrate, then check the query plans
+    python migrations.py --check    # only check the query plans
+"""
+import argparse
+import json
+import sys
+
+from sqlalchemy import case, delete, func, insert, inspect, select, text, update
+from sqlalchemy.exc import OperationalError
+
+from models import BestScore, Crossword, Score, db
+from utils import compile_puzzle, numbering_fields
+
+
+def add_column(conn, table, column, ddl):
+    if column not in {c['name'] for c in inspect(conn).get_columns(table)}:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def create_indexes(conn, model):
+    for index in model.__table__.indexes:
+        index.create(conn, checkfirst=True)
+
+
+def store_numbering(conn, batch_size=100):
+    """Add the clue numbering columns and fill them for crosswords saved before they existed."""
+    for column in ('number_grid', 'clue_lists', 'answer_key'):
+        add_column(conn, Crossword.__tablename__, column, 'TEXT')
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            select(Crossword.id, Crossword.grid, Crossword.words)
+            .where(Crossword.answer_key.is_(None), Crossword.id > last_id)
+            .order_by(Crossword.id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        for crossword_id, grid, words in rows:
+            try:
+                fields = numbering_fields(compile_puzzle(json.loads(grid), json.loads(words), empty=' '))
+            except (TypeError, ValueError, KeyError, IndexError) as e:
+                # left NULL: the play page numbers the grid itself
+                print(f"crossword {crossword_id}: {e!r}, numbering not stored", file=sys.stderr)
+                continue
+            # keep updated_at: the puzzle itself has not changed
+            conn.execute(update(Crossword).where(Crossword.id == crossword_id)
+                         .values(updated_at=Crossword.updated_at, **fields))
+        last_id = rows[-1][0]
+
+
+def rebuild_best_scores(conn):
+    """Create best_scores if missing and recompute each player's best score per crossword."""
+    BestScore.__table__.create(conn, checkfirst=True)
+    # same identity as app.player_key
+    identity = case(
+        (Score.user_id.isnot(None), 'user_' + func.cast(Score.user_id, db.String)),
+        else_='guest_' + func.coalesce(Score.guest_token, '') + '_' + func.coalesce(Score.guest_name, ''),
+    )
+    ranked = select(
+        Score.crossword_id, identity.label('player_key'), Score.user_id, Score.guest_name, Score.score,
+        Score.id.label('score_id'), Score.created_at,
+        func.row_number().over(partition_by=(Score.crossword_id, identity),
+                               order_by=(Score.score.desc(), Score.id)).label('rnk'),
+    ).subquery()
+    best = select(
+        ranked.c.crossword_id, ranked.c.player_key, ranked.c.user_id, ranked.c.guest_name, ranked.c.score,
+        ranked.c.score_id, ranked.c.created_at,
+    ).where(ranked.c.rnk == 1)
+    conn.execute(delete(BestScore))
+    conn.execute(insert(BestScore).from_select(
+        ['crossword_id', 'player_key', 'user_id', 'guest_name', 'score', 'score_id', 'achieved_at'], best))
+
+
+def count_plays(conn):
+    """Add the play counters and count the scores recorded so far."""
+    add_column(conn, Crossword.__tablename__, 'play_count', "INTEGER NOT NULL DEFAULT 0")
+    add_column(conn, Crossword.__tablename__, 'last_played_at', "DATETIME")
+    plays = select(func.count(Score.id)).where(Score.crossword_id == Crossword.id).scalar_subquery()
+    last_played = select(func.max(Score.created_at)).where(Score.crossword_id == Crossword.id).scalar_subquery()
+    conn.execute(update(Crossword).values(play_count=plays, last_played_at=last_played,
+                                          updated_at=Crossword.updated_at))
+
+
+def add_query_indexes(conn):
+    """Indexes for the play page, leaderboards, listings and the author dashboard."""
+    create_indexes(conn, Crossword)
+    create_indexes(conn, Score)
+    create_indexes(conn, BestScore)
+
+
+# (user_version after the step, description, step); append new steps, never reorder
+MIGRATIONS = [
+    (1, "store clue numbering and answer keys", store_numbering),
+    (2, "best score per player and crossword", rebuild_best_scores),
+    (3, "indexes for the hot queries", add_query_indexes),
+    (4, "play counters", count_plays),
+]
+
+
+def schema_version(conn):
+    return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def migrate(engine, verbose=True):
+    """Create missing tables, then run the migrations the database has not had yet."""
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        current = schema_version(conn)
+    for version, description, step in MIGRATIONS:
+        if version <= current:
+            continue
+        with engine.begin() as conn:
+            step(conn)
+            conn.exec_driver_sql(f"PRAGMA user_version = {version}")
+        if verbose:
+            print(f"Migrated to {version}: {description}")
+    return max(current, MIGRATIONS[-1][0])
+
+
+# (route, query, parameters): the lookups the routes depend on being indexed
+INDEXED_QUERIES = [
+    ("play page", "SELECT id FROM crossword WHERE author_username = ? AND slug = ?", ('admin', 'x')),
+    ("play page leaderboard",
+     "SELECT id FROM best_scores WHERE crossword_id = ? ORDER BY score DESC LIMIT 5", (1,)),
+    ("scoreboard",
+     "SELECT id FROM best_scores WHERE crossword_id = ? AND score <= ? AND (score < ? OR id < ?) "
+     "ORDER BY score DESC, id DESC LIMIT 51", (1, 50, 50, 10)),
+    ("published listings",
+     "SELECT id FROM crossword WHERE is_published = 1 ORDER BY created_at DESC LIMIT 20", ()),
+    ("games list page",
+     "SELECT id FROM crossword WHERE is_published = 1 AND created_at <= ? AND (created_at < ? OR id < ?) "
+     "ORDER BY created_at DESC, id DESC LIMIT 25", ('2024-01-01', '2024-01-01', 10)),
+    ("author dashboard", "SELECT id FROM crossword WHERE author_id = ?", (1,)),
+]
+
+
+def check_query_plans(engine):
+    """(route, plan detail) for every step of INDEXED_QUERIES that scans a table or sorts in a temp b-tree."""
+    problems = []
+    with engine.connect() as conn:
+        for route, query, params in INDEXED_QUERIES:
+            try:
+                plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + query, params).all()
+            except OperationalError as e:  # e.g. a table the migrations have not created yet
+                problems.append((route, str(e.orig)))
+                continue
+            for row in plan:
+                detail = row[-1]
+                if (detail.startswith('SCAN') and 'USING' not in detail) or 'TEMP B-TREE' in detail:
+                    problems.append((route, detail))
+    return problems
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Migrate the database schema and check the query plans.")
+    parser.add_argument('--check', action='store_true', help="only check that the hot queries use indexes")
+    args = parser.parse_args()
+
+    from app import app
+    with app.app_context():
+        if not args.check:
+            print(f"Schema version {migrate(db.engine)}.")
+        problems = check_query_plans(db.engine)
+    for route, detail in problems:
+        print(f"{route}: {detail}")
+    print("Query plans OK." if not problems else f"{len(problems)} query plan problem(s).")
+    sys.exit(1 if problems else 0)
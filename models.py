@@ -11,6 +11,12 @@ class User(UserMixin, db.Model):
     crosswords = db.relationship('Crossword', backref='author', lazy=True)
 
 class Crossword(db.Model):
+    # play page lookup, published listings newest first, author dashboard (see migrations.py)
+    __table_args__ = (
+        db.Index('ix_crossword_author_slug', 'author_username', 'slug'),
+        db.Index('ix_crossword_published_created', 'is_published', 'created_at'),
+        db.Index('ix_crossword_author_id', 'author_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(128), nullable=False)
     slug = db.Column(db.String(200), unique=True, nullable=False)
@@ -22,9 +28,20 @@ class Crossword(db.Model):
     updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
     is_published = db.Column(db.Boolean, default=False)
     font_file = db.Column(db.String(255), nullable=True)
+    # clue numbering and answer key as JSON, written whenever grid/words are saved (see persist_numbering)
+    number_grid = db.Column(db.Text, nullable=True)
+    clue_lists = db.Column(db.Text, nullable=True)
+    answer_key = db.Column(db.Text, nullable=True)
+    # scores recorded for the puzzle, counted as they are written (see record_score)
+    play_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    last_played_at = db.Column(db.DateTime, nullable=True)
 
 
 class Score(db.Model):
+    # a puzzle's scores, best first; also serves lookups on crossword_id alone
+    __table_args__ = (
+        db.Index('ix_score_crossword_score', 'crossword_id', 'score'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     crossword_id = db.Column(db.Integer, db.ForeignKey('crossword.id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
@@ -34,3 +51,22 @@ class Score(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     crossword = db.relationship('Crossword', backref=db.backref('scores', lazy=True))
     user = db.relationship('User', backref=db.backref('scores', lazy=True))
+
+
+class BestScore(db.Model):
+    """Each player's best score per crossword, kept up to date by record_score for the leaderboards."""
+    __tablename__ = 'best_scores'
+    __table_args__ = (
+        db.UniqueConstraint('crossword_id', 'player_key'),
+        db.Index('ix_best_scores_crossword_score', 'crossword_id', 'score'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    crossword_id = db.Column(db.Integer, db.ForeignKey('crossword.id'), nullable=False)
+    # 'user_<id>' for members, 'guest_<token>_<name>' for guests
+    player_key = db.Column(db.String(200), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    guest_name = db.Column(db.String(100), nullable=True)
+    score = db.Column(db.Integer, nullable=False)
+    score_id = db.Column(db.Integer, db.ForeignKey('score.id'), nullable=False)
+    achieved_at = db.Column(db.DateTime, default=datetime.utcnow)
+    user = db.relationship('User')
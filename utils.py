@@ -1,3 +1,4 @@
+import json
 from typing import List, Tuple, Dict, Any, Optional
 
 def assign_clue_numbers(grid: List[List[str]],
@@ -65,4 +66,110 @@ def assign_clue_numbers(grid: List[List[str]],
         'clues': clues_all,
         'across': across,
         'down': down
-    }
\ No newline at end of file
+    }
+
+
+class CompiledPuzzle:
+    """
+    Everything the play page and answer checking derive from a crossword's stored grid
+    and words, computed once: parsed grid, number grid, clue lists, words annotated with
+    their clue number, the answer-free word list for the client and the answer key.
+    """
+    __slots__ = ('grid', 'number_grid', 'clues', 'words', 'words_meta', 'answers')
+
+    def __init__(self, grid, number_grid, clues, words, words_meta, answers):
+        self.grid = grid
+        self.number_grid = number_grid
+        self.clues = clues
+        self.words = words
+        self.words_meta = words_meta
+        # [(number, 'across' | 'down', answer in upper case, clue)] in word order
+        self.answers = answers
+
+
+def compile_puzzle(grid: List[List[str]], words: List[Any], empty: str = ' ',
+                   numbering: Optional[Dict[str, Any]] = None) -> CompiledPuzzle:
+    """
+    Build the CompiledPuzzle of a parsed grid and word list (dicts or [word, clue, row, col, vertical]).
+    numbering is the stored result of an earlier build (see numbering_fields); without it the
+    grid is numbered with assign_clue_numbers. Its optional 'answer_key' supplies the answers.
+    """
+    normalized = []
+    for w in words:
+        if isinstance(w, dict):
+            normalized.append(w)
+        else:
+            word_text, clue_text, row, col, vert = w[0], w[1], w[2], w[3], w[4]
+            normalized.append({'word': word_text, 'clue': clue_text, 'row': int(row), 'col': int(col),
+                               'vertical': bool(vert)})
+
+    answer_key = None
+    if numbering is None:
+        numbering = assign_clue_numbers(grid, normalized, empty=empty)
+    else:
+        # the scan in assign_clue_numbers lists clues by number, across before down
+        numbering = dict(numbering, clues=sorted(numbering['across'] + numbering['down'],
+                                                 key=lambda c: (c['number'], c['orientation'] == 'down')))
+        answer_key = numbering.get('answer_key')
+        if answer_key is not None and len(answer_key) != len(normalized):
+            answer_key = None  # saved for another word list
+    number_grid = numbering.get("number_grid")
+
+    rows = len(grid)
+    cols = len(grid[0]) if rows else 0
+
+    if not number_grid:
+        number_grid = [[None] * cols for _ in range(rows)]
+    else:
+        while len(number_grid) < rows:
+            number_grid.append([None] * cols)
+        for r in range(rows):
+            if len(number_grid[r]) < cols:
+                number_grid[r].extend([None] * (cols - len(number_grid[r])))
+
+    clues = {
+        "all": numbering["clues"],
+        "across": numbering["across"],
+        "down": numbering["down"]
+    }
+
+    num_map = {}
+    for c in numbering['clues']:
+        key = (int(c['row']), int(c['col']), True if c['orientation'] == 'down' else False)
+        num_map[key] = int(c['number'])
+
+    annotated_words = []
+    words_meta = []
+    answers = []
+    for w in normalized:
+        number = num_map.get((int(w.get('row', 0)), int(w.get('col', 0)), bool(w.get('vertical', False))))
+        annotated = w.copy()
+        annotated['number'] = number
+        annotated_words.append(annotated)
+        words_meta.append({
+            "number": number,
+            "clue": w["clue"],
+            "row": w["row"],
+            "col": w["col"],
+            "vertical": w["vertical"],
+            "length": len(w["word"])
+        })
+        if answer_key is None:
+            answers.append((number, 'down' if w['vertical'] else 'across', w['word'].upper(), w['clue']))
+    if answer_key is not None:
+        answers = [(number, direction, answer, w['clue']) for (number, direction, answer), w in zip(answer_key, normalized)]
+
+    return CompiledPuzzle(grid, number_grid, clues, annotated_words, words_meta, answers)
+
+
+def numbering_fields(puzzle: CompiledPuzzle) -> Dict[str, str]:
+    """
+    The numbering of a compiled puzzle as the JSON column values stored on Crossword:
+    number_grid, clue_lists ({'across': [...], 'down': [...]}) and answer_key
+    ([[number, 'across' | 'down', ANSWER], ...] in word order).
+    """
+    return {
+        'number_grid': json.dumps(puzzle.number_grid),
+        'clue_lists': json.dumps({'across': puzzle.clues['across'], 'down': puzzle.clues['down']}),
+        'answer_key': json.dumps([[number, direction, answer] for number, direction, answer, _ in puzzle.answers]),
+    }